@@ -1,7 +1,11 @@
 import sqlalchemy as sql
 import sqlalchemy.ext.declarative as declarative
 import sqlalchemy.orm as orm
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from dotenv import load_dotenv
+from typing import Dict, Optional
+import threading
+import time
 import os
 
 # Load environment variables from .env file
@@ -10,8 +14,112 @@ load_dotenv(".env")
 # Get the database URL from environment variables
 DATABASE_URL = os.environ.get("DATABASE_URL")
 
+# Get the async database URL, defaulting to the asyncpg driver for PostgreSQL URLs
+ASYNC_DATABASE_URL = os.environ.get("ASYNC_DATABASE_URL") or \
+    sql.engine.make_url(DATABASE_URL).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+# Connection pool settings
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+pool_options = {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_recycle": DB_POOL_RECYCLE,
+    "pool_pre_ping": DB_POOL_PRE_PING,
+}
+
+# The statement timeout is a PostgreSQL setting, passed differently by each driver
+connect_args = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"} if DB_STATEMENT_TIMEOUT_MS else {}
+async_connect_args = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}} if DB_STATEMENT_TIMEOUT_MS else {}
+
+class PoolMetrics:
+    """
+    Tracks the checkouts of a connection pool, the connections it opens, how long checkouts wait
+    for a connection, and how often they give up after DB_POOL_TIMEOUT.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_checkout(self, *args):
+        with self._lock:
+            self.checkouts += 1
+
+    def record_connect(self, *args):
+        with self._lock:
+            self.connects += 1
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.total_wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "checkouts": self.checkouts,
+            "connects": self.connects,
+            "timeouts": self.timeouts,
+            "avgWaitMs": self.total_wait_seconds / self.checkouts * 1000 if self.checkouts else 0.0,
+            "maxWaitMs": self.max_wait_seconds * 1000,
+        }
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+class TimedPoolMixin:
+    """
+    Times every checkout of the pool, whoever asks for the connection: sessions, engine.connect() or
+    the async engine. The pool events only fire once a connection is checked out, so the wait itself
+    is measured around connect().
+    """
+    metrics: PoolMetrics
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except sql.exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+class TimedQueuePool(TimedPoolMixin, sql.pool.QueuePool):
+    metrics = pool_metrics
+
+class TimedAsyncQueuePool(TimedPoolMixin, sql.pool.AsyncAdaptedQueuePool):
+    metrics = async_pool_metrics
+
+def listen_pool_metrics(engine: sql.engine.Engine, metrics: PoolMetrics):
+    """
+    Count the checkouts and the new connections of the pool of an engine.
+    """
+    sql.event.listen(engine, "checkout", metrics.record_checkout)
+    sql.event.listen(engine, "connect", metrics.record_connect)
+
 # Create the SQLAlchemy engine
-engine = sql.create_engine(DATABASE_URL)
+engine = sql.create_engine(DATABASE_URL, connect_args=connect_args, poolclass=TimedQueuePool, **pool_options)
+listen_pool_metrics(engine, pool_metrics)
+
+# Create the async SQLAlchemy engine used by the request handlers
+async_engine = create_async_engine(ASYNC_DATABASE_URL, connect_args=async_connect_args,
+                                   poolclass=TimedAsyncQueuePool, **pool_options)
+listen_pool_metrics(async_engine.sync_engine, async_pool_metrics)
 
 # Base class for declarative models
 Base = declarative.declarative_base()
@@ -19,6 +127,34 @@ Base = declarative.declarative_base()
 # SessionLocal for database operations
 SessionLocal = orm.sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# AsyncSessionLocal for database operations that must not block the event loop
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+def get_pool_stats(pool, metrics: Optional[PoolMetrics] = None) -> Dict[str, object]:
+    """
+    Return the live state of a connection pool, with the recorded wait times if given.
+    """
+    stats = {
+        "size": pool.size(),
+        "checkedIn": pool.checkedin(),
+        "checkedOut": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "maxOverflow": DB_MAX_OVERFLOW,
+        "saturation": pool.checkedout() / (DB_POOL_SIZE + DB_MAX_OVERFLOW) if DB_POOL_SIZE + DB_MAX_OVERFLOW else 0.0,
+    } if isinstance(pool, sql.pool.QueuePool) else {"pool": pool.status()}
+    if metrics:
+        stats.update(metrics.stats())
+    return stats
+
+def pool_stats() -> Dict[str, object]:
+    """
+    Return the live state of the sync and async connection pools.
+    """
+    return {
+        "sync": get_pool_stats(engine.pool, pool_metrics),
+        "async": get_pool_stats(async_engine.sync_engine.pool, async_pool_metrics),
+    }
+
 def get_db():
     """
     Provides a database session for use in the application.
@@ -28,3 +164,10 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """
+    Provides an async database session for use in the application.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,8 +1,12 @@
 from sqlalchemy import (
-    Column, Integer, String, Float, Date, ForeignKey
+    Column, Integer, String, Float, Date, ForeignKey, Index
 )
 from sqlalchemy.orm import relationship
 from .database import Base, engine
+import os
+
+# Range partitioning of the Cars table by Website_post_date, as set up by the ETL ("none", "month" or "year")
+PARTITIONED = os.getenv("CARS_PARTITION_BY", "none") != "none"
 
 # Dimension Tables
 
@@ -73,7 +77,7 @@ class Damage(Base):
 class Cars(Base):
     __tablename__ = "Cars"
 
-    ID = Column(Integer, primary_key=True, index=True)
+    ID = Column(Integer, primary_key=True, index=True, autoincrement=True)
     Model_ID = Column(Integer, ForeignKey("Model.ID"), nullable=False)
     Fuel_type_ID = Column(Integer, ForeignKey("Fuel_type.ID"), nullable=False)
     Color_ID = Column(Integer, ForeignKey("Color.ID"), nullable=False)
@@ -81,14 +85,36 @@ class Cars(Base):
     Transmission_ID = Column(Integer, ForeignKey("Transmission.ID"), nullable=False)
     Options_ID = Column(Integer, ForeignKey("Options.ID"), nullable=False)
     Damage_ID = Column(Integer, ForeignKey("Damage.ID"), nullable=False)
+    Car_make_ID = Column(Integer, ForeignKey("Car_make.ID"), nullable=False)
 
     Year = Column(Integer, nullable=False)
     Mileage = Column(Float, nullable=False)
     Horsepower = Column(Float, nullable=False)
-    Website_post_date = Column(Date, nullable=False)
+    # Partitioned tables need the partition key in their primary key
+    Website_post_date = Column(Date, nullable=False, primary_key=PARTITIONED)
     Sell_date = Column(Date, nullable=True)
     Num_of_prev_owners = Column(Integer, nullable=False)
     Estimated_price = Column(Float, nullable=False)
+    # Hash of the columns identifying a listing in the source data, used for incremental loads
+    Source_key = Column(String(32), nullable=True)
+
+    __table_args__ = (
+        Index("uq_cars_source_key", "Source_key", "Website_post_date", unique=True),
+        # Lookups by make, model and year; also serves the Car_make_ID foreign key
+        Index("ix_cars_make_model_year", "Car_make_ID", "Model_ID", "Year"),
+        # Foreign keys, for joins and filters on a single dimension
+        Index("ix_cars_model_id", "Model_ID"),
+        Index("ix_cars_fuel_type_id", "Fuel_type_ID"),
+        Index("ix_cars_color_id", "Color_ID"),
+        Index("ix_cars_body_style_id", "Body_style_ID"),
+        Index("ix_cars_transmission_id", "Transmission_ID"),
+        Index("ix_cars_options_id", "Options_ID"),
+        Index("ix_cars_damage_id", "Damage_ID"),
+        # Date ranges of listings and sales
+        Index("ix_cars_website_post_date", "Website_post_date"),
+        Index("ix_cars_sell_date", "Sell_date"),
+        {"postgresql_partition_by": 'RANGE ("Website_post_date")'} if PARTITIONED else {},
+    )
 
     # Relationships
     model = relationship("Model")
@@ -98,6 +124,7 @@ class Cars(Base):
     transmission = relationship("Transmission")
     options = relationship("Option")
     damage = relationship("Damage")
+    car_make = relationship("CarMake")
 
 # Create all tables
 Base.metadata.create_all(engine)
@@ -0,0 +1,114 @@
+"""
+Inference Benchmarks
+This script measures the latency of the days-to-sell model on encoded feature matrices.
+
+Benchmarks:
+- sell-time: Loads the serving models from MODEL_STORAGE_PATH and times CatBoost's predict()
+  (with every core and with one thread), the compiled trees and the CatBoostScorer used by the API
+  on batches of 1 to N rows. Every path is checked to return exactly the predictions of predict().
+
+Usage:
+    python benchmark.py sell-time --model-dir ../model/models --rows 1 2 4 8 16 64 1024
+"""
+
+import argparse
+import os
+import time
+import numpy as np
+from catboost_scorer import CatBoostScorer, ObliviousTrees
+from model_registry import ModelRegistry
+
+def random_features(rows, width, seed=0):
+    """
+    Build random encoded rows: numeric values in the first columns, one-hot values in the middle
+    and a log price in the last one.
+
+    Parameters:
+    - rows (int): Number of rows.
+    - width (int): Number of encoded features.
+    - seed (int): Seed of the random generator.
+
+    Returns:
+    - np.ndarray: The feature matrix.
+    """
+    rng = np.random.default_rng(seed)
+    features = rng.integers(0, 2, size=(rows, width)).astype(np.float64)
+    features[:, :4] = rng.integers(0, 200_000, size=(rows, 4))
+    features[:, -1] = rng.normal(10, 1, size=rows)
+    return features
+
+def time_call(func, features, min_seconds):
+    """
+    Call func on the features repeatedly for at least min_seconds.
+
+    Returns:
+    - float: The average number of microseconds per call.
+    """
+    func(features)
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        func(features)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls * 1e6
+
+def benchmark_sell_time(model_dir, row_counts, max_compiled_rows, min_seconds):
+    """
+    Time every prediction path of the days-to-sell model for each batch size.
+
+    Parameters:
+    - model_dir (str): Directory holding the model bundle or the legacy pickles.
+    - row_counts (list): Batch sizes to time.
+    - max_compiled_rows (int): Largest batch the CatBoostScorer evaluates from the compiled trees.
+    - min_seconds (float): Minimum time spent on each measurement.
+
+    Returns:
+    - list: One (rows, {path: microseconds per call}) tuple per batch size.
+    """
+    registry = ModelRegistry(model_dir, [], max_compiled_rows=0)
+    registry.reload(force=True)
+    if registry.current.categorical_features:
+        raise SystemExit("The days-to-sell model takes categorical features and cannot be compiled")
+    model = registry.current.sell_time_model.model
+
+    trees = ObliviousTrees.from_catboost(model)
+    scorer = CatBoostScorer.compile(model, max_compiled_rows)
+    paths = {
+        "catboost": model.predict,
+        "catboost 1 thread": lambda features: model.predict(features, thread_count=1),
+        "compiled trees": trees.predict,
+        "scorer": scorer.predict,
+    }
+
+    print(f"{'rows':>6}" + "".join(f"{name:>20}" for name in paths))
+    results = []
+    for rows in row_counts:
+        features = random_features(rows, trees.feature_count)
+        expected = model.predict(features)
+        timings = {}
+        for name, func in paths.items():
+            if not np.array_equal(func(features), expected):
+                raise AssertionError(f"{name} does not match CatBoost's predictions on {rows} rows")
+            timings[name] = time_call(func, features, min_seconds)
+        results.append((rows, timings))
+        print(f"{rows:>6}" + "".join(f"{timings[name]:>18.1f}µs" for name in paths))
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark model inference.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    sell_time_parser = subparsers.add_parser("sell-time", help="Latency of the days-to-sell model per batch size.")
+    sell_time_parser.add_argument("--model-dir", default=os.getenv("MODEL_STORAGE_PATH", os.path.join("..", "model", "models")),
+                                  help="Directory holding the model bundle or the legacy pickles.")
+    sell_time_parser.add_argument("--rows", type=int, nargs="+", default=[1, 2, 4, 8, 16, 64, 1024],
+                                  help="Batch sizes to time.")
+    sell_time_parser.add_argument("--max-compiled-rows", type=int, default=int(os.getenv("CATBOOST_COMPILED_MAX_ROWS", "8")),
+                                  help="Largest batch scored from the compiled trees.")
+    sell_time_parser.add_argument("--min-seconds", type=float, default=0.5, help="Minimum time spent on each measurement.")
+
+    args = parser.parse_args()
+    if args.benchmark == "sell-time":
+        benchmark_sell_time(args.model_dir, args.rows, args.max_compiled_rows, args.min_seconds)
@@ -0,0 +1,136 @@
+from catboost import CatBoostRegressor, FeaturesData
+from typing import Any, Dict, Optional, Sequence
+import json
+import os
+import tempfile
+import numpy as np
+
+
+class ObliviousTrees:
+    """
+    NumPy evaluator compiled from the oblivious trees of a CatBoost model with float features only.
+
+    Every tree is padded to the same depth with splits that never fire, so a row is scored by
+    comparing its features with all borders at once, turning the comparison bits of each tree into
+    a leaf index, and summing the leaf values. The leaves are summed tree by tree, in model order,
+    like CatBoost does, so the predictions are bit-identical. This skips the Pool construction that
+    dominates CatBoost's predict() on single rows, but scales worse, so it is only meant for small batches.
+    """
+
+    def __init__(self, features: np.ndarray, borders: np.ndarray, leaf_values: np.ndarray,
+                 scale: float, bias: float, feature_count: int):
+        trees, depth = features.shape
+        self.feature_count = feature_count
+        self.depth = depth
+        self._split_features = features.ravel()
+        self._borders = borders
+        self._bit_weights = 1 << np.arange(depth, dtype=np.intp)
+        self._leaf_offsets = np.arange(trees, dtype=np.intp) << depth
+        self._leaf_values = leaf_values.ravel()
+        self.scale = scale
+        self.bias = bias
+
+    @classmethod
+    def from_catboost(cls, model: CatBoostRegressor) -> "ObliviousTrees":
+        """
+        Compile the trees of a fitted model from its JSON export.
+        Raises ValueError if the model uses categorical or text features.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model.json")
+            model.save_model(path, format="json")
+            with open(path) as f:
+                exported = json.load(f)
+
+        trees = exported["oblivious_trees"]
+        features_info = exported["features_info"]
+        if set(features_info) - {"float_features"}:
+            raise ValueError("Only models with float features can be compiled")
+
+        depth = max(len(tree["splits"]) for tree in trees)
+        features = np.zeros((len(trees), depth), dtype=np.intp)
+        borders = np.full((len(trees), depth), np.inf, dtype=np.float32)
+        leaf_values = np.zeros((len(trees), 1 << depth), dtype=np.float64)
+        for i, tree in enumerate(trees):
+            for level, split in enumerate(tree["splits"]):
+                features[i, level] = split["float_feature_index"]
+                borders[i, level] = split["border"]
+            leaf_values[i, :len(tree["leaf_values"])] = tree["leaf_values"]
+
+        scale, biases = exported["scale_and_bias"]
+        feature_count = len(features_info["float_features"])
+        return cls(features, borders, leaf_values, float(scale), float(biases[0]), feature_count)
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        n = len(features)
+        # CatBoost compares float32 features with float32 borders
+        values = np.asarray(features, dtype=np.float32)[:, self._split_features].reshape(n, -1, self.depth)
+        leaves = (values > self._borders).astype(np.intp) @ self._bit_weights + self._leaf_offsets
+        return np.cumsum(self._leaf_values[leaves], axis=1)[:, -1] * self.scale + self.bias
+
+    def matches(self, model: Any, rows: int = 256, seed: int = 0) -> bool:
+        """
+        Check that the compiled trees return exactly the predictions of the model on random encoded rows:
+        numeric values in the first columns, one-hot values in the middle and a log price in the last one.
+        """
+        rng = np.random.default_rng(seed)
+        features = rng.integers(0, 2, size=(rows, self.feature_count)).astype(np.float64)
+        features[:, :4] = rng.integers(0, 200_000, size=(rows, 4))
+        features[:, -1] = rng.normal(10, 1, size=rows)
+        return bool(np.array_equal(self.predict(features), model.predict(features)))
+
+
+class CatBoostScorer:
+    """
+    Days-to-sell scorer picking the fastest exact path for each call: the compiled trees for small
+    batches and CatBoost's own predict(), with a bounded thread count, for larger ones.
+
+    A model with categorical features is given the columns of its numerical and categorical inputs
+    in the encoded matrix. The categorical columns hold dimension IDs, which are passed to CatBoost
+    as strings, the way it hashes the integer IDs it was trained on.
+    """
+
+    def __init__(self, model: CatBoostRegressor, trees: Optional[ObliviousTrees] = None,
+                 max_compiled_rows: int = 8, thread_count: int = -1,
+                 numeric_columns: Optional[Sequence[int]] = None, categorical_columns: Optional[Sequence[int]] = None):
+        self.model = model
+        self.trees = trees
+        self.max_compiled_rows = max_compiled_rows
+        self.thread_count = thread_count
+        self.numeric_columns = None if numeric_columns is None else np.asarray(numeric_columns, dtype=np.intp)
+        self.categorical_columns = None if categorical_columns is None else np.asarray(categorical_columns, dtype=np.intp)
+
+    @classmethod
+    def compile(cls, model: CatBoostRegressor, max_compiled_rows: int = 8, thread_count: int = -1) -> "CatBoostScorer":
+        """
+        Wrap a model, compiling its trees when they can be evaluated exactly.
+        Models that cannot be compiled, or whose compiled trees do not match predict(), use predict() only.
+        """
+        trees = None
+        if max_compiled_rows > 0:
+            try:
+                trees = ObliviousTrees.from_catboost(model)
+            except (ValueError, KeyError):
+                trees = None
+            if trees is not None and not trees.matches(model):
+                print("Compiled trees do not match the days to sell model; using its predict method")
+                trees = None
+        return cls(model, trees, max_compiled_rows, thread_count)
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        if self.trees is not None and len(features) <= self.max_compiled_rows:
+            return self.trees.predict(features)
+        if self.categorical_columns is not None:
+            features = FeaturesData(
+                num_feature_data=np.ascontiguousarray(features[:, self.numeric_columns], dtype=np.float32),
+                cat_feature_data=features[:, self.categorical_columns].astype(np.int64).astype(str).astype(object),
+            )
+        return self.model.predict(features, thread_count=self.thread_count)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "compiled": self.trees is not None,
+            "categoricalFeatures": 0 if self.categorical_columns is None else len(self.categorical_columns),
+            "maxCompiledRows": self.max_compiled_rows,
+            "threadCount": self.thread_count,
+        }
@@ -0,0 +1,106 @@
+from Database.models import CarMake, Model, FuelType, Color, BodyStyle, Transmission, Option, Damage
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+from datetime import datetime
+import hashlib
+import json
+
+# Name column of each dimension table
+NAME_COLUMNS = {
+    CarMake: CarMake.car_make,
+    Model: Model.model,
+    Transmission: Transmission.transmission,
+    FuelType: FuelType.fuel_type,
+    BodyStyle: BodyStyle.body_style,
+    Color: Color.color,
+    Option: Option.option,
+    Damage: Damage.damage,
+}
+
+# Key of each dimension in the /options payload
+OPTION_KEYS = {
+    FuelType: "fuelTypes",
+    Color: "colors",
+    BodyStyle: "bodyStyles",
+    Transmission: "transmissions",
+    Option: "carOptions",
+    Damage: "damages",
+}
+
+
+class DimensionCache:
+    """
+    In-memory ID -> name lookup for every dimension table.
+
+    The dimension tables only change when the ETL runs, so they are read once with one
+    query per table and served from memory afterwards. A refresh builds new dictionaries
+    and swaps them in, so concurrent readers never see a half-loaded cache.
+    """
+
+    def __init__(self):
+        self._names: Dict[type, Dict[int, str]] = {table: {} for table in NAME_COLUMNS}
+        self.loaded_at: Optional[datetime] = None
+
+        # Pre-serialized /options payload and its ETag
+        self.options_payload: bytes = b""
+        self.options_etag: str = ""
+
+    def refresh(self, db: Session):
+        """
+        Reload every dimension table from the database.
+        """
+        names = {
+            table: {record_id: name for record_id, name in db.query(table.ID, column).all()}
+            for table, column in NAME_COLUMNS.items()
+        }
+        models_by_make: Dict[int, List[int]] = {}
+        for model_id, make_id in db.query(Model.ID, Model.Car_make_id).order_by(Model.ID).all():
+            models_by_make.setdefault(make_id, []).append(model_id)
+
+        payload = self._serialize_options(names, models_by_make)
+
+        self._names = names
+        self.options_payload = payload
+        self.options_etag = f'"{hashlib.sha1(payload).hexdigest()}"'
+        self.loaded_at = datetime.utcnow()
+
+    @staticmethod
+    def _serialize_options(names: Dict[type, Dict[int, str]], models_by_make: Dict[int, List[int]]) -> bytes:
+        """
+        Serialize every dimension, with the make -> models tree, into the /options JSON payload.
+        """
+        def options(table, ids=None) -> List[Dict[str, object]]:
+            table_names = names[table]
+            return [{"id": id_value, "name": table_names[id_value]} for id_value in sorted(ids if ids is not None else table_names)]
+
+        payload = {
+            "makes": [
+                dict(make, models=options(Model, models_by_make.get(make["id"], [])))
+                for make in options(CarMake)
+            ],
+        }
+        for table, key in OPTION_KEYS.items():
+            payload[key] = options(table)
+
+        return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+    def names(self, table) -> Dict[int, str]:
+        """
+        Return the ID -> name dictionary of the given table.
+        """
+        return self._names[table]
+
+    def get(self, table, id_value: int) -> Optional[str]:
+        """
+        Return the name of the given ID in the given table, or None if it does not exist.
+        """
+        return self._names[table].get(id_value)
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Return the number of cached rows per table and the time of the last refresh.
+        """
+        return {
+            "loadedAt": self.loaded_at.isoformat() if self.loaded_at else None,
+            "tables": {table.__tablename__: len(names) for table, names in self._names.items()},
+        }
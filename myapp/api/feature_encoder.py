@@ -0,0 +1,130 @@
+from operator import attrgetter
+from typing import Dict, List, Sequence, Tuple
+import threading
+import time
+import numpy as np
+
+
+class FeatureEncoder:
+    """
+    Compiled encoder turning prediction requests into rows of the model input matrix.
+
+    All the string work happens once in compile(): for every dimension field it builds an
+    integer lookup array indexed by ID that holds the column of the matching one-hot feature,
+    or -1 when the ID has no column (dropped baseline category or unknown ID). Encoding is then
+    a handful of integer writes into a preallocated float64 matrix.
+
+    For models taking the dimension IDs as categorical features, the raw IDs of the given fields
+    are also written into the last columns, after the extra columns.
+    """
+
+    def __init__(self, width: int, numeric_fields: Sequence[str], numeric_columns: Sequence[int],
+                 dimension_fields: Sequence[str], lookups: Sequence[np.ndarray], extra_columns: int = 0,
+                 id_fields: Sequence[str] = ()):
+        self.width = width + extra_columns + len(id_fields)
+        self.numeric_columns = np.asarray(numeric_columns, dtype=np.intp)
+        self.lookups = list(lookups)
+        self.dimension_fields = list(dimension_fields)
+        self.id_fields = list(id_fields)
+        self._get_numerics = attrgetter(*numeric_fields)
+        self._get_ids = attrgetter(*dimension_fields)
+        self._get_raw_ids = attrgetter(*id_fields) if id_fields else None
+
+        # Encoding timings, updated from the inference threads
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.rows = 0
+        self.total_seconds = 0.0
+
+    @classmethod
+    def compile(cls, template: List[str], numeric_features: Dict[str, str],
+                mappings: Dict[str, Dict[int, str]], extra_columns: int = 0,
+                id_fields: Sequence[str] = ()) -> "FeatureEncoder":
+        """
+        Build an encoder for the given feature template.
+
+        Parameters:
+        - template (list): Ordered feature names expected by the model.
+        - numeric_features (dict): Request field -> feature name of every numerical feature.
+        - mappings (dict): Request field -> {ID: one-hot feature name} of every dimension field.
+        - extra_columns (int): Number of zero columns appended after the template columns.
+        - id_fields (list): Request fields whose raw IDs are written into the last columns, in order.
+
+        Returns:
+        - FeatureEncoder: The compiled encoder.
+        """
+        feature_index = {feature: i for i, feature in enumerate(template)}
+
+        lookups = []
+        for mapping in mappings.values():
+            lookup = np.full(max(mapping, default=-1) + 1, -1, dtype=np.intp)
+            for id_value, feature in mapping.items():
+                if id_value >= 0:
+                    lookup[id_value] = feature_index[feature]
+            lookups.append(lookup)
+
+        return cls(
+            width=len(template),
+            numeric_fields=list(numeric_features),
+            numeric_columns=[feature_index[feature] for feature in numeric_features.values()],
+            dimension_fields=list(mappings),
+            lookups=lookups,
+            extra_columns=extra_columns,
+            id_fields=id_fields,
+        )
+
+    def encode_batch(self, items) -> Tuple[np.ndarray, float]:
+        """
+        Encode prediction requests into a float64 matrix with one row per request.
+
+        Returns:
+        - np.ndarray: The encoded feature matrix.
+        - float: Seconds spent encoding.
+        """
+        start = time.perf_counter()
+        n = len(items)
+        features = np.zeros((n, self.width), dtype=np.float64)
+
+        if n == 1:
+            # Plain integer writes are cheaper than array operations for a single row
+            row = features[0]
+            row[self.numeric_columns] = self._get_numerics(items[0])
+            for lookup, id_value in zip(self.lookups, self._get_ids(items[0])):
+                if 0 <= id_value < len(lookup) and lookup[id_value] >= 0:
+                    row[lookup[id_value]] = 1
+            if self._get_raw_ids:
+                row[self.width - len(self.id_fields):] = self._get_raw_ids(items[0])
+        elif n:
+            features[:, self.numeric_columns] = [self._get_numerics(data) for data in items]
+            ids = np.array([self._get_ids(data) for data in items], dtype=np.int64).reshape(n, -1)
+
+            rows = np.arange(n)
+            for j, lookup in enumerate(self.lookups):
+                column_ids = ids[:, j]
+                known = (column_ids >= 0) & (column_ids < len(lookup))
+                columns = lookup[column_ids[known]]
+                active = columns >= 0
+                features[rows[known][active], columns[active]] = 1
+            if self._get_raw_ids:
+                features[:, self.width - len(self.id_fields):] = np.array([self._get_raw_ids(data) for data in items]).reshape(n, -1)
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.calls += 1
+            self.rows += n
+            self.total_seconds += elapsed
+        return features, elapsed
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return the number of encoded batches and rows and the average encoding time.
+        """
+        with self._lock:
+            calls, rows, total_seconds = self.calls, self.rows, self.total_seconds
+        return {
+            "calls": calls,
+            "rows": rows,
+            "totalSeconds": total_seconds,
+            "avgMicrosecondsPerCall": total_seconds / calls * 1e6 if calls else 0.0,
+            "avgMicrosecondsPerRow": total_seconds / rows * 1e6 if rows else 0.0,
+        }
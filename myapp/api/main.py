@@ -1,13 +1,18 @@
-import pandas as pd
-from Database.models import CarMake, Model, FuelType, Color, BodyStyle, Transmission, Option, Damage, Cars
-from Database.database import get_db
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
-from datetime import datetime
-from sqlalchemy.orm import Session
-from fastapi import FastAPI, Depends, HTTPException
+from Database.models import CarMake, Model, FuelType, Color, BodyStyle, Transmission, Option, Damage
+from Database.database import get_async_db, SessionLocal, pool_stats
+from dimension_cache import DimensionCache
+from feature_encoder import FeatureEncoder
+from model_registry import ModelRegistry, ModelSet
+from prediction_cache import PredictionCache
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import FastAPI, Depends, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-import pickle
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
 import os
 import numpy as np
 
@@ -21,8 +26,8 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
-# Fixed final_features_template matching the model's expected features
-final_features_template: List[str] = [
+# Feature template of the legacy pickled models, which do not store it
+legacy_features_template: List[str] = [
     'Mileage', 'Year', 'Horsepower', 'Num_of_prev_owners',
     'Car_make_BMW', 'Car_make_Chevrolet', 'Car_make_Ford',
     'Car_make_Mercedes-Benz', 'Car_make_Toyota',
@@ -42,89 +47,118 @@ final_features_template: List[str] = [
     'Fuel_type_Hybrid', 'Fuel_type_Plug-in Hybrid'
 ]
 
-# Global mapping dictionaries
-make_mapping: Dict[int, str] = {}
-model_mapping: Dict[int, str] = {}
-transmission_mapping: Dict[int, str] = {}
-fuel_mapping: Dict[int, str] = {}
-body_style_mapping: Dict[int, str] = {}
-color_mapping: Dict[int, str] = {}
-option_mapping: Dict[int, str] = {}
-damage_mapping: Dict[int, str] = {}
-
 # Numerical features (fixed)
 numerical_features = ['Mileage', 'Year', 'Horsepower', 'Num_of_prev_owners']
 
-# Function to initialize mappings based on the fixed final_features_template
-def initialize_mappings(db: Session):
-    global make_mapping, model_mapping, transmission_mapping, fuel_mapping
-    global body_style_mapping, color_mapping, option_mapping, damage_mapping
-
-    # Car Makes
-    makes = db.query(CarMake).all()
-    make_mapping = {make.ID: f"Car_make_{make.car_make.replace(' ', '_')}" 
-                   for make in makes 
-                   if f"Car_make_{make.car_make.replace(' ', '_')}" in final_features_template}
-
-    # Models
-    models = db.query(Model).all()
-    model_mapping = {model.ID: f"Model_{model.model.replace(' ', '_')}" 
-                    for model in models 
-                    if f"Model_{model.model.replace(' ', '_')}" in final_features_template}
-
-    # Transmissions
-    transmissions = db.query(Transmission).all()
-    transmission_mapping = {trans.ID: f"Transmission_{trans.transmission.replace(' ', '_')}" 
-                            for trans in transmissions 
-                            if f"Transmission_{trans.transmission.replace(' ', '_')}" in final_features_template}
-
-    # Fuel Types
-    fuels = db.query(FuelType).all()
-    fuel_mapping = {fuel.ID: f"Fuel_type_{fuel.fuel_type.replace(' ', '_')}" 
-                   for fuel in fuels 
-                   if f"Fuel_type_{fuel.fuel_type.replace(' ', '_')}" in final_features_template}
-
-    # Body Styles
-    body_styles = db.query(BodyStyle).all()
-    body_style_mapping = {body.ID: f"Body_style_{body.body_style.replace(' ', '_')}" 
-                          for body in body_styles 
-                          if f"Body_style_{body.body_style.replace(' ', '_')}" in final_features_template}
-
-    # Colors
-    colors = db.query(Color).all()
-    color_mapping = {color.ID: f"Color_{color.color.replace(' ', '_')}" 
-                     for color in colors 
-                     if f"Color_{color.color.replace(' ', '_')}" in final_features_template}
-
-    # Options
-    options = db.query(Option).all()
-    option_mapping = {opt.ID: f"Options_{opt.option.replace(' ', '_')}" 
-                     for opt in options 
-                     if f"Options_{opt.option.replace(' ', '_')}" in final_features_template}
-
-    # Damages
-    damages = db.query(Damage).all()
-    damage_mapping = {dam.ID: f"Damage_{dam.damage.replace(' ', '_')}" 
-                      for dam in damages 
-                      if f"Damage_{dam.damage.replace(' ', '_')}" in final_features_template}
-
-# Dependency to initialize mappings once at startup
-@app.on_event("startup")
-def startup_event():
-    db = next(get_db())
-    initialize_mappings(db)
+# Fields of PredictionRequest holding each numerical feature
+numerical_fields = {
+    "mileage": "Mileage",
+    "year": "Year",
+    "horsepower": "Horsepower",
+    "numPrevOwners": "Num_of_prev_owners",
+}
+
+# Fields of PredictionRequest holding the dimension ID of each categorical feature of the days-to-sell model
+id_features = {
+    "Car_make_ID": "makeId",
+    "Model_ID": "modelId",
+    "Transmission_ID": "transmissionId",
+    "Options_ID": "optionId",
+    "Color_ID": "colorId",
+    "Damage_ID": "damageId",
+    "Body_style_ID": "bodyStyleId",
+    "Fuel_type_ID": "fueltypeId",
+}
+
+# In-memory copy of the dimension tables, so /predict never has to query them
+dimension_cache = DimensionCache()
+
+# Seconds between background refreshes of the dimension cache (0 disables them)
+DIMENSION_CACHE_TTL = float(os.getenv("DIMENSION_CACHE_TTL", "0"))
+
+def one_hot_mapping(prefix: str, names: Dict[int, str], template: List[str]) -> Dict[int, str]:
+    """
+    Map every ID to its one-hot feature, named f"{prefix}_{name}" as pd.get_dummies names it,
+    keeping only the features present in the template. The values without a column, such as the
+    baseline category dropped in training, are encoded as all zeros.
+    """
+    features = set(template)
+    mapping = {}
+    for id_value, name in names.items():
+        feature = f"{prefix}_{name}"
+        if feature in features:
+            mapping[id_value] = feature
+    return mapping
+
+# Function to compile the feature encoder of a model's feature template from the dimension cache
+def build_feature_encoder(template: List[str], categorical_features: List[str] = ()) -> FeatureEncoder:
+    # The extra column after the template holds the price feature of the days-to-sell model,
+    # followed by the raw IDs of its categorical features, if it takes any
+    return FeatureEncoder.compile(
+        template,
+        numerical_fields,
+        {
+            "makeId": one_hot_mapping("Car_make", dimension_cache.names(CarMake), template),
+            "modelId": one_hot_mapping("Model", dimension_cache.names(Model), template),
+            "transmissionId": one_hot_mapping("Transmission", dimension_cache.names(Transmission), template),
+            "fueltypeId": one_hot_mapping("Fuel_type", dimension_cache.names(FuelType), template),
+            "bodyStyleId": one_hot_mapping("Body_style", dimension_cache.names(BodyStyle), template),
+            "colorId": one_hot_mapping("Color", dimension_cache.names(Color), template),
+            "optionId": one_hot_mapping("Options", dimension_cache.names(Option), template),
+            "damageId": one_hot_mapping("Damage", dimension_cache.names(Damage), template),
+        },
+        extra_columns=1,
+        id_fields=[id_features[feature] for feature in categorical_features],
+    )
+
+def refresh_dimensions():
+    """
+    Reload the dimension cache from the database and rebuild the feature encoder from it.
+    """
+    db = SessionLocal()
+    try:
+        dimension_cache.refresh(db)
+    finally:
+        db.close()
+    model_registry.rebuild_encoder()
+    prediction_cache.clear()
 
-def get_name_from_database(db: Session, table, id_value: int):
+async def refresh_dimensions_periodically():
     """
-    Retrieve the name corresponding to the given ID from the specified table.
+    Refresh the dimension cache every DIMENSION_CACHE_TTL seconds without blocking the event loop.
     """
-    record = db.query(table).filter(table.ID == id_value).first()
-    if record:
-        return record.car_make if table == CarMake else record.model if table == Model else \
-               record.transmission if table == Transmission else record.fuel_type if table == FuelType else \
-               record.body_style if table == BodyStyle else record.color if table == Color else \
-               record.option if table == Option else record.damage if table == Damage else None
-    return None
+    while True:
+        await asyncio.sleep(DIMENSION_CACHE_TTL)
+        try:
+            await asyncio.to_thread(refresh_dimensions)
+        except Exception as e:
+            print(f"Error refreshing dimension cache: {e}")
+
+# Load the dimension cache, then the models and their encoder, once at startup
+@app.on_event("startup")
+async def startup_event():
+    await asyncio.to_thread(refresh_dimensions)
+    await asyncio.to_thread(model_registry.reload, True)
+    if DIMENSION_CACHE_TTL > 0:
+        asyncio.create_task(refresh_dimensions_periodically())
+    if MODEL_WATCH_INTERVAL > 0:
+        asyncio.create_task(model_registry.watch(MODEL_WATCH_INTERVAL))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    inference_executor.shutdown(wait=False)
+
+# Fields of PredictionRequest holding a dimension ID, with the table they refer to
+dimension_fields = {
+    "makeId": CarMake,
+    "modelId": Model,
+    "transmissionId": Transmission,
+    "fueltypeId": FuelType,
+    "bodyStyleId": BodyStyle,
+    "colorId": Color,
+    "optionId": Option,
+    "damageId": Damage,
+}
 
 # Define the data model for prediction input
 class PricePredictionRequest(BaseModel):
@@ -133,19 +167,44 @@ class PricePredictionRequest(BaseModel):
 class DaysToSellPredictionRequest(BaseModel):
     price: int
 
+# Cache of prediction responses keyed on the full request
+prediction_cache = PredictionCache(
+    max_size=int(os.getenv("PREDICTION_CACHE_SIZE", "10000")),
+    ttl_seconds=float(os.getenv("PREDICTION_CACHE_TTL", "3600")),
+)
+
 # Load models
-MODEL_DIR = os.getenv("MODEL_STORAGE_PATH", "myapp\\model\\models")
-price_model_path = os.path.join(MODEL_DIR, "elastic_net_price_model.pkl")
-sell_time_model_path = os.path.join(MODEL_DIR, "catboost_sell_time_model.pkl")
-
-try:
-    with open(price_model_path, "rb") as f:
-        price_model = pickle.load(f)
-    with open(sell_time_model_path, "rb") as f:
-        sell_time_model = pickle.load(f)
-except FileNotFoundError:
-    price_model = None
-    sell_time_model = None  # Ensure sell_time_model is also set to None
+MODEL_DIR = os.getenv("MODEL_STORAGE_PATH", os.path.join("myapp", "model", "models"))
+
+# Whether the legacy pickled models may be loaded when MODEL_DIR holds no model bundle
+ALLOW_PICKLED_MODELS = os.getenv("ALLOW_PICKLED_MODELS", "true").lower() in ("1", "true", "yes")
+
+# Seconds between checks of MODEL_DIR for a new model version (0 disables them)
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "0"))
+
+# Largest batch scored from the compiled CatBoost trees; larger ones go through CatBoost's predict (0 disables the trees)
+CATBOOST_COMPILED_MAX_ROWS = int(os.getenv("CATBOOST_COMPILED_MAX_ROWS", "8"))
+
+# Threads used by each CatBoost predict call (-1 uses every core)
+CATBOOST_THREAD_COUNT = int(os.getenv("CATBOOST_THREAD_COUNT", "-1"))
+
+def warm_up_models(models: ModelSet):
+    """
+    Run one prediction through a freshly loaded set, so its first request does not pay the lazy initialization.
+    """
+    predict_matrix(np.zeros((1, models.encoder.width)), models)
+
+# Model version serving predictions, reloaded in the background and swapped in atomically
+model_registry = ModelRegistry(
+    MODEL_DIR,
+    legacy_features_template,
+    allow_pickled=ALLOW_PICKLED_MODELS,
+    build_encoder=build_feature_encoder,
+    warm_up=warm_up_models,
+    on_swap=lambda models: prediction_cache.clear(),
+    max_compiled_rows=CATBOOST_COMPILED_MAX_ROWS,
+    catboost_thread_count=CATBOOST_THREAD_COUNT,
+)
 
 class OptionResponse(BaseModel):
     id: int
@@ -167,6 +226,7 @@ class PredictionRequest(BaseModel):
 
 # Define the response model for the prediction
 class Prediction(BaseModel):
+    modelVersion: Optional[str] = None
     price: float
     time: float
     make: str
@@ -182,21 +242,115 @@ class Prediction(BaseModel):
     horsepower: int
     numPrevOwners: int
 
+class BatchPredictionItem(BaseModel):
+    index: int
+    prediction: Optional[Prediction] = None
+    error: Optional[str] = None
+
+# Maximum number of items accepted by /predict/batch
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "10000"))
+
+def predict_matrix(features: np.ndarray, models: ModelSet) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Predict the log price and the days to sell for every row of an encoded feature matrix.
+    Each model of the given set is called once for the whole matrix.
+    """
+    # The template columns are followed by the predicted price column and the dimension IDs, if any
+    price_column = len(models.features)
+
+    # Predict price using the ElasticNet model
+    if not models.price_model:
+        raise HTTPException(status_code=500, detail="Price model not loaded")
+    try:
+        predicted_prices = models.price_model.predict(features[:, :price_column])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error predicting price: {str(e)}")
+
+    # Predict days to sell using the CatBoost model
+    if not models.sell_time_model:
+        raise HTTPException(status_code=500, detail="Days to sell model not loaded")
+    try:
+        features[:, price_column] = np.log1p(predicted_prices)
+        predicted_times = models.sell_time_model.predict(features)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error predicting days to sell: {str(e)}")
+
+    return predicted_prices, predicted_times
+
+# Bounded thread pool running model inference off the event loop. sklearn and CatBoost
+# release the GIL while predicting, so inference scales with the number of workers.
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", str(os.cpu_count() or 1)))
+inference_executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
+
+async def run_in_inference_pool(func, *args):
+    """
+    Run a blocking inference function on the inference thread pool and await its result.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(inference_executor, func, *args)
+
+def encode_and_predict(items: List[PredictionRequest], models: ModelSet) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Encode a batch of requests and run both models of the given set on it.
+    Returns the predicted log prices, the predicted days to sell and the encoding time in seconds.
+    """
+    features, encode_seconds = models.encoder.encode_batch(items)
+    predicted_prices, predicted_times = predict_matrix(features, models)
+    return predicted_prices, predicted_times, encode_seconds
+
+def format_validation_error(error: ValidationError) -> str:
+    """
+    Flatten a pydantic validation error into a single readable message.
+    """
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors()
+    )
+
+# Key of a request in the prediction cache: the values of all its fields
+prediction_key = attrgetter(*dimension_fields, *numerical_fields)
+
+def server_timing(encode_seconds: float) -> str:
+    """
+    Format the encoding time as a Server-Timing header value in milliseconds.
+    """
+    return f"encode;dur={encode_seconds * 1000:.3f}"
+
+# Cache-Control header of the /options payload
+OPTIONS_CACHE_CONTROL = os.getenv("OPTIONS_CACHE_CONTROL", "public, max-age=60")
+
 # Define GET endpoints for each array with documentation
 
+@app.get("/options")
+async def get_all_options(request: Request):
+    """
+    Retrieve every dimension, with the models of each make, in a single pre-serialized payload.
+    Clients sending a matching If-None-Match header get an empty 304 response.
+    """
+    if not dimension_cache.options_payload:
+        raise HTTPException(status_code=404, detail="No Options available.")
+
+    headers = {"ETag": dimension_cache.options_etag, "Cache-Control": OPTIONS_CACHE_CONTROL}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    etags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if dimension_cache.options_etag in etags or "*" in etags:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=dimension_cache.options_payload, media_type="application/json", headers=headers)
+
 @app.get("/make-options", response_model=List[OptionResponse])
-async def get_make_options(db: Session = Depends(get_db)):
-    makes = db.query(CarMake).all()
+async def get_make_options(db: AsyncSession = Depends(get_async_db)):
+    makes = (await db.execute(select(CarMake))).scalars().all()
     if not makes:
         raise HTTPException(status_code=404, detail="No Make Options available.")
     return [{"id": make.ID, "name": make.car_make} for make in makes]
 
 @app.get("/model-options/{makeId}", response_model=List[OptionResponse])
-async def get_model_options(makeId: int, db: Session = Depends(get_db)):
+async def get_model_options(makeId: int, db: AsyncSession = Depends(get_async_db)):
     """
     Retrieve the list of car models for a specific make by makeId.
     """
-    models = db.query(Model).filter(Model.Car_make_id == makeId).all()
+    models = (await db.execute(select(Model).filter(Model.Car_make_id == makeId))).scalars().all()
     
     if not models:
         raise HTTPException(
@@ -206,53 +360,63 @@ async def get_model_options(makeId: int, db: Session = Depends(get_db)):
     return [{"id": model.ID, "name": model.model} for model in models]
 
 @app.get("/fuel-type-options", response_model=List[OptionResponse])
-async def get_fuel_type_options(db: Session = Depends(get_db)):
-    fuel_types = db.query(FuelType).all()
+async def get_fuel_type_options(db: AsyncSession = Depends(get_async_db)):
+    fuel_types = (await db.execute(select(FuelType))).scalars().all()
     if not fuel_types:
         raise HTTPException(status_code=404, detail="No Fuel Type Options available.")
     return [{"id": fuel_type.ID, "name": fuel_type.fuel_type} for fuel_type in fuel_types]
 
 @app.get("/color-options", response_model=List[OptionResponse])
-async def get_color_options(db: Session = Depends(get_db)):
-    colors = db.query(Color).all()
+async def get_color_options(db: AsyncSession = Depends(get_async_db)):
+    colors = (await db.execute(select(Color))).scalars().all()
     if not colors:
         raise HTTPException(status_code=404, detail="No Color Options available.")
     return [{"id": color.ID, "name": color.color} for color in colors]
 
 @app.get("/body-style-options", response_model=List[OptionResponse])
-async def get_body_style_options(db: Session = Depends(get_db)):
-    body_styles = db.query(BodyStyle).all()
+async def get_body_style_options(db: AsyncSession = Depends(get_async_db)):
+    body_styles = (await db.execute(select(BodyStyle))).scalars().all()
     if not body_styles:
         raise HTTPException(status_code=404, detail="No Body Style Options available.")
     return [{"id": body_style.ID, "name": body_style.body_style} for body_style in body_styles]
 
 @app.get("/transmission-options", response_model=List[OptionResponse])
-async def get_transmission_options(db: Session = Depends(get_db)):
-    transmissions = db.query(Transmission).all()
+async def get_transmission_options(db: AsyncSession = Depends(get_async_db)):
+    transmissions = (await db.execute(select(Transmission))).scalars().all()
     if not transmissions:
         raise HTTPException(status_code=404, detail="No Transmission Options available.")
     return [{"id": transmission.ID, "name": transmission.transmission} for transmission in transmissions]
 
 @app.get("/car-option-options", response_model=List[OptionResponse])
-async def get_car_option_options(db: Session = Depends(get_db)):
-    options = db.query(Option).all()
+async def get_car_option_options(db: AsyncSession = Depends(get_async_db)):
+    options = (await db.execute(select(Option))).scalars().all()
     if not options:
         raise HTTPException(status_code=404, detail="No Car Option Options available.")
     return [{"id": option.ID, "name": option.option} for option in options]
 
 @app.get("/damage-options", response_model=List[OptionResponse])
-async def get_damage_options(db: Session = Depends(get_db)):
-    damages = db.query(Damage).all()
+async def get_damage_options(db: AsyncSession = Depends(get_async_db)):
+    damages = (await db.execute(select(Damage))).scalars().all()
     if not damages:
         raise HTTPException(status_code=404, detail="No Damage Options available.")
     return [{"id": damage.ID, "name": damage.damage} for damage in damages]
 
 @app.post("/predict", response_model=Prediction)
-async def make_prediction(data: PredictionRequest, db: Session = Depends(get_db)):
+async def make_prediction(data: PredictionRequest, response: Response):
     """
     Make a prediction based on the provided data and return the predicted price and time.
     The endpoint raises a 401 error if any of the required fields are missing.
     """
+    # The whole request is served by the version current now, even if a reload swaps it meanwhile
+    models = model_registry.current
+
+    # Repeat quotes are answered from the cache without running the models
+    cache_key = (models.version, *prediction_key(data))
+    cached = prediction_cache.get(cache_key)
+    if cached is not None:
+        response.headers["Server-Timing"] = "cache;desc=hit"
+        return cached
+
     # Check for missing fields
     missing_fields = []
     for field, value in data.dict().items():
@@ -262,81 +426,30 @@ async def make_prediction(data: PredictionRequest, db: Session = Depends(get_db)
     if missing_fields:
         raise HTTPException(status_code=401, detail=f"Missing fields: {', '.join(missing_fields)}")
 
-    # Get the corresponding names from the database
-    make_name = get_name_from_database(db, CarMake, data.makeId)
-    model_name = get_name_from_database(db, Model, data.modelId)
-    transmission_name = get_name_from_database(db, Transmission, data.transmissionId)
-    fueltype_name = get_name_from_database(db, FuelType, data.fueltypeId)
-    bodyStyle_name = get_name_from_database(db, BodyStyle, data.bodyStyleId)
-    color_name = get_name_from_database(db, Color, data.colorId)
-    option_name = get_name_from_database(db, Option, data.optionId)
-    damage_name = get_name_from_database(db, Damage, data.damageId)
+    # Get the corresponding names from the dimension cache
+    make_name = dimension_cache.get(CarMake, data.makeId)
+    model_name = dimension_cache.get(Model, data.modelId)
+    transmission_name = dimension_cache.get(Transmission, data.transmissionId)
+    fueltype_name = dimension_cache.get(FuelType, data.fueltypeId)
+    bodyStyle_name = dimension_cache.get(BodyStyle, data.bodyStyleId)
+    color_name = dimension_cache.get(Color, data.colorId)
+    option_name = dimension_cache.get(Option, data.optionId)
+    damage_name = dimension_cache.get(Damage, data.damageId)
 
     # If any ID is invalid or not found, raise an error
     if not all([make_name, model_name, transmission_name, fueltype_name, bodyStyle_name, color_name, option_name, damage_name]):
         raise HTTPException(status_code=400, detail="Invalid ID provided for one or more fields.")
 
-    # Prepare the features for prediction models
-    transformed_features = {feature: 0 for feature in final_features_template}
-
-    # Assign numerical features
-    transformed_features['Mileage'] = data.mileage
-    transformed_features['Year'] = data.year
-    transformed_features['Horsepower'] = data.horsepower
-    transformed_features['Num_of_prev_owners'] = data.numPrevOwners
-
-    # Assign one-hot encoded features if they exist in the mapping
-    if data.makeId in make_mapping:
-        transformed_features[make_mapping[data.makeId]] = 1
-
-    if data.modelId in model_mapping:
-        transformed_features[model_mapping[data.modelId]] = 1
-
-    if data.transmissionId in transmission_mapping:
-        transformed_features[transmission_mapping[data.transmissionId]] = 1
-
-    if data.fueltypeId in fuel_mapping:
-        transformed_features[fuel_mapping[data.fueltypeId]] = 1
-
-    if data.bodyStyleId in body_style_mapping:
-        transformed_features[body_style_mapping[data.bodyStyleId]] = 1
-
-    if data.colorId in color_mapping:
-        transformed_features[color_mapping[data.colorId]] = 1
-
-    if data.optionId in option_mapping:
-        transformed_features[option_mapping[data.optionId]] = 1
-
-    if data.damageId in damage_mapping:
-        transformed_features[damage_mapping[data.damageId]] = 1
-
-    # Convert transformed features to the input format expected by the model
-    try:
-        final_features = [transformed_features[feature] for feature in final_features_template]
-    except KeyError as e:
-        raise HTTPException(status_code=400, detail=f"Feature missing in final_features_template: {str(e)}")
-
-    # Predict price using the ElasticNet model
-    if not price_model:
-        raise HTTPException(status_code=500, detail="Price model not loaded")
-    try:
-        predicted_price = price_model.predict([final_features])[0]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error predicting price: {str(e)}")
-
-    # Predict days to sell using the CatBoost model
-    if not sell_time_model:
-        raise HTTPException(status_code=500, detail="Days to sell model not loaded")
-    try:
-        final_features.append(np.log1p(predicted_price))
-        predicted_time = sell_time_model.predict([final_features])[0]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error predicting days to sell: {str(e)}")
+    # Encode the request on the loop and run both models on the inference pool
+    features, encode_seconds = models.encoder.encode_batch([data])
+    response.headers["Server-Timing"] = server_timing(encode_seconds)
+    predicted_prices, predicted_times = await run_in_inference_pool(predict_matrix, features, models)
 
-    # Return the prediction along with the names of the fields
-    return {
-        "price": np.exp(predicted_price),
-        "time": predicted_time,
+    # Return the prediction along with the names of the fields and the model version
+    prediction = {
+        "modelVersion": models.version,
+        "price": np.exp(predicted_prices[0]),
+        "time": predicted_times[0],
         "make": make_name,
         "model": model_name,
         "transmission": transmission_name,
@@ -350,3 +463,106 @@ async def make_prediction(data: PredictionRequest, db: Session = Depends(get_db)
         "horsepower": data.horsepower,
         "numPrevOwners": data.numPrevOwners
     }
+    prediction_cache.put(cache_key, prediction)
+    return prediction
+
+@app.post("/predict/batch", response_model=List[BatchPredictionItem])
+async def make_batch_prediction(items: List[Any], response: Response):
+    """
+    Make predictions for a list of cars with a single call to each model.
+    Results are returned in input order. Items that fail validation or reference unknown IDs
+    get an error message instead of a prediction without failing the rest of the batch.
+    """
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch size exceeds the limit of {MAX_BATCH_SIZE} items.")
+
+    results: List[Dict[str, Any]] = [{"index": i} for i in range(len(items))]
+
+    # Validate every item on its own
+    valid: List[Tuple[int, PredictionRequest]] = []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[i]["error"] = "Item must be a JSON object."
+            continue
+        try:
+            valid.append((i, PredictionRequest(**item)))
+        except ValidationError as e:
+            results[i]["error"] = format_validation_error(e)
+
+    # Resolve the names of all referenced IDs from the dimension cache
+    names = {field: dimension_cache.names(table) for field, table in dimension_fields.items()}
+
+    scored: List[Tuple[int, PredictionRequest]] = []
+    for i, data in valid:
+        unknown = [field for field, lookup in names.items() if getattr(data, field) not in lookup]
+        if unknown:
+            results[i]["error"] = f"Invalid ID provided for: {', '.join(unknown)}"
+        else:
+            scored.append((i, data))
+
+    if scored:
+        models = model_registry.current
+        predicted_prices, predicted_times, encode_seconds = await run_in_inference_pool(
+            encode_and_predict, [data for _, data in scored], models
+        )
+        response.headers["Server-Timing"] = server_timing(encode_seconds)
+        prices = np.exp(predicted_prices)
+
+        for (i, data), price, time in zip(scored, prices, predicted_times):
+            results[i]["prediction"] = {
+                "modelVersion": models.version,
+                "price": price,
+                "time": time,
+                "make": names["makeId"][data.makeId],
+                "model": names["modelId"][data.modelId],
+                "transmission": names["transmissionId"][data.transmissionId],
+                "fueltype": names["fueltypeId"][data.fueltypeId],
+                "bodyStyle": names["bodyStyleId"][data.bodyStyleId],
+                "color": names["colorId"][data.colorId],
+                "option": names["optionId"][data.optionId],
+                "damage": names["damageId"][data.damageId],
+                "year": data.year,
+                "mileage": data.mileage,
+                "horsepower": data.horsepower,
+                "numPrevOwners": data.numPrevOwners
+            }
+
+    return results
+
+@app.post("/admin/refresh-dimensions")
+async def refresh_dimension_cache():
+    """
+    Reload the dimension cache and the one-hot mappings from the database, e.g. after an ETL run.
+    """
+    await asyncio.to_thread(refresh_dimensions)
+    return dimension_cache.stats()
+
+@app.post("/admin/reload-models")
+async def reload_models():
+    """
+    Load the latest models from MODEL_STORAGE_PATH in the background, warm them up and swap them in.
+    Requests in flight finish on the previous version. If loading fails, the previous version keeps serving.
+    """
+    try:
+        await asyncio.to_thread(model_registry.reload, True)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error loading models: {e}")
+    models = model_registry.current
+    return {
+        "priceModelLoaded": models.price_model is not None,
+        "sellTimeModelLoaded": models.sell_time_model is not None,
+        "model": model_registry.stats(),
+    }
+
+@app.get("/admin/stats")
+async def get_stats():
+    """
+    Report the state of the in-process caches, the feature encoding timings and the connection pools.
+    """
+    return {
+        "dimensions": dimension_cache.stats(),
+        "model": model_registry.stats(),
+        "encoder": model_registry.current.encoder.stats() if model_registry.current.encoder else None,
+        "predictionCache": prediction_cache.stats(),
+        "pool": pool_stats(),
+    }
@@ -0,0 +1,85 @@
+from catboost import CatBoostRegressor
+from linear_scorer import LinearScorer
+from typing import Any, Dict, List, Optional
+import json
+import os
+import numpy as np
+
+# Versions of the bundle layout written by train.py: 2 for days-to-sell models taking dimension IDs
+BUNDLE_FORMATS = (1, 2)
+
+# File holding the name of the latest bundle directory
+LATEST_FILE = "LATEST"
+MANIFEST_FILE = "manifest.json"
+
+
+class ModelBundle:
+    """
+    Versioned model bundle written by train.py: a directory holding a JSON manifest, the ElasticNet
+    coefficients as a NumPy array, the CatBoost model in its native .cbm format and the feature template.
+    The days-to-sell model either takes the one-hot features followed by the predicted price, or the
+    features listed in the manifest with the dimension IDs as categorical features.
+
+    Nothing is unpickled. The coefficients are memory-mapped read-only, so every API worker
+    shares the same pages.
+    """
+
+    def __init__(self, path: str, manifest: Dict[str, Any], price_model: LinearScorer, sell_time_model: CatBoostRegressor):
+        self.path = path
+        self.manifest = manifest
+        self.version: str = manifest["version"]
+        self.features: List[str] = manifest["features"]
+        self.sell_time_features: List[str] = manifest["sellTimeModel"]["features"]
+        self.categorical_features: List[str] = manifest["sellTimeModel"].get("categoricalFeatures", [])
+        self.price_model = price_model
+        self.sell_time_model = sell_time_model
+
+    @classmethod
+    def load(cls, path: str) -> "ModelBundle":
+        """
+        Load the bundle stored in the given directory.
+        """
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        if manifest.get("format") not in BUNDLE_FORMATS:
+            raise ValueError(f"Unsupported model bundle format {manifest.get('format')} in {path}")
+
+        price = manifest["priceModel"]
+        coef = np.load(os.path.join(path, price["coefficients"]), mmap_mode="r", allow_pickle=False)
+        if coef.shape != (len(manifest["features"]),):
+            raise ValueError(f"Price model has {coef.shape[0]} coefficients for {len(manifest['features'])} features")
+        price_model = LinearScorer(coef, float(price["intercept"]))
+
+        sell_time_model = CatBoostRegressor()
+        sell_time_model.load_model(os.path.join(path, manifest["sellTimeModel"]["file"]), format="cbm")
+        categorical_features = manifest["sellTimeModel"].get("categoricalFeatures", [])
+        cat_features = [manifest["sellTimeModel"]["features"][i] for i in sell_time_model.get_cat_feature_indices()]
+        if cat_features != categorical_features:
+            raise ValueError(f"Days to sell model has categorical features {cat_features}, the manifest lists {categorical_features}")
+
+        return cls(path, manifest, price_model, sell_time_model)
+
+    def info(self) -> Dict[str, Any]:
+        """
+        Return the version, creation time and training metrics of the bundle.
+        """
+        return {
+            "version": self.version,
+            "createdAt": self.manifest.get("createdAt"),
+            "features": len(self.features),
+            "priceScorer": "linear",
+            "sellTimeInput": "native" if self.categorical_features else "one_hot",
+            "metrics": self.manifest.get("metrics"),
+        }
+
+
+def latest_bundle_path(model_dir: str) -> Optional[str]:
+    """
+    Return the directory of the latest bundle in model_dir, or None if there is no bundle.
+    """
+    try:
+        with open(os.path.join(model_dir, LATEST_FILE)) as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(model_dir, version) if version else None
@@ -0,0 +1,216 @@
+from model_bundle import ModelBundle, latest_bundle_path
+from catboost_scorer import CatBoostScorer
+from feature_encoder import FeatureEncoder
+from linear_scorer import LinearScorer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime
+import asyncio
+import os
+import pickle
+import threading
+
+PRICE_MODEL_FILE = "elastic_net_price_model.pkl"
+SELL_TIME_MODEL_FILE = "catboost_sell_time_model.pkl"
+
+
+class ModelSet:
+    """
+    One loaded model version: both models, the feature template they expect, the dimension IDs
+    the days-to-sell model takes as categorical features, and the feature encoder compiled for them.
+    Instances are never modified, so a request that read the current set keeps using the same
+    version until it completes.
+    """
+
+    def __init__(self, version: Optional[str], signature: Tuple, price_model: Any, sell_time_model: Any,
+                 features: List[str], info: Dict[str, Any], encoder: Optional[FeatureEncoder] = None,
+                 categorical_features: Sequence[str] = ()):
+        self.version = version
+        self.signature = signature
+        self.price_model = price_model
+        self.sell_time_model = sell_time_model
+        self.features = features
+        self.info = info
+        self.encoder = encoder
+        self.categorical_features = list(categorical_features)
+
+    def with_encoder(self, encoder: FeatureEncoder) -> "ModelSet":
+        """
+        Return a copy of the set using the given encoder, e.g. after the dimension tables changed.
+        """
+        return ModelSet(self.version, self.signature, self.price_model, self.sell_time_model,
+                        self.features, self.info, encoder, self.categorical_features)
+
+
+class ModelRegistry:
+    """
+    Holds the model version serving predictions and replaces it without restarting the workers.
+
+    A reload loads the new version next to the current one, compiles its feature encoder, warms it up
+    with a prediction and only then swaps it in with a single assignment. Requests in flight keep the
+    set they started with. A version that fails to load or warm up is never swapped in, and the
+    previous version keeps serving.
+    """
+
+    def __init__(self, model_dir: str, legacy_features: List[str], allow_pickled: bool = True,
+                 build_encoder: Optional[Callable[[List[str], List[str]], FeatureEncoder]] = None,
+                 warm_up: Optional[Callable[[ModelSet], None]] = None,
+                 on_swap: Optional[Callable[[ModelSet], None]] = None,
+                 max_compiled_rows: int = 8, catboost_thread_count: int = -1):
+        self.model_dir = model_dir
+        self.legacy_features = legacy_features
+        self.allow_pickled = allow_pickled
+        self.build_encoder = build_encoder
+        self.warm_up = warm_up
+        self.on_swap = on_swap
+        self.max_compiled_rows = max_compiled_rows
+        self.catboost_thread_count = catboost_thread_count
+
+        self._current = ModelSet(None, (), None, None, legacy_features, {"version": None})
+        self._lock = threading.Lock()
+        self._failed_signature: Optional[Tuple] = None
+
+        # Reload history
+        self.loaded_at: Optional[datetime] = None
+        self.reloads = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def current(self) -> ModelSet:
+        return self._current
+
+    def signature(self) -> Tuple:
+        """
+        Identify the version on disk: the bundle named in LATEST, or the modification times of the
+        legacy pickles. The watcher reloads when it changes.
+        """
+        bundle_path = latest_bundle_path(self.model_dir)
+        if bundle_path:
+            return ("bundle", bundle_path)
+        if not self.allow_pickled:
+            return ()
+        try:
+            return ("pickle", *(os.path.getmtime(os.path.join(self.model_dir, name))
+                                for name in (PRICE_MODEL_FILE, SELL_TIME_MODEL_FILE)))
+        except OSError:
+            return ()
+
+    def _load(self, signature: Tuple) -> ModelSet:
+        if not signature:
+            return ModelSet(None, signature, None, None, self.legacy_features, {"version": None})
+
+        if signature[0] == "bundle":
+            bundle = ModelBundle.load(signature[1])
+            info = bundle.info()
+            sell_time_model = self._compile_sell_time_model(bundle.sell_time_model, info, bundle.features,
+                                                            bundle.sell_time_features, bundle.categorical_features)
+            return ModelSet(bundle.version, signature, bundle.price_model, sell_time_model,
+                            bundle.features, info, categorical_features=bundle.categorical_features)
+
+        with open(os.path.join(self.model_dir, PRICE_MODEL_FILE), "rb") as f:
+            price_model = pickle.load(f)
+        with open(os.path.join(self.model_dir, SELL_TIME_MODEL_FILE), "rb") as f:
+            sell_time_model = pickle.load(f)
+        info = {"version": "legacy", "features": len(self.legacy_features), "priceScorer": "estimator"}
+
+        # Score the linear price model from its coefficients when that gives exactly the same predictions
+        if hasattr(price_model, "coef_"):
+            scorer = LinearScorer.from_estimator(price_model)
+            if scorer.matches(price_model):
+                price_model = scorer
+                info["priceScorer"] = "linear"
+            else:
+                print("Linear scorer does not match the price model; using its predict method")
+        sell_time_model = self._compile_sell_time_model(sell_time_model, info, self.legacy_features)
+        return ModelSet("legacy", signature, price_model, sell_time_model, self.legacy_features, info)
+
+    def _compile_sell_time_model(self, model: Any, info: Dict[str, Any], features: List[str],
+                                 sell_time_features: Optional[List[str]] = None,
+                                 categorical_features: Sequence[str] = ()) -> Any:
+        """
+        Wrap a CatBoost days-to-sell model in a scorer that evaluates small batches from its compiled trees.
+        A model taking categorical features is given the columns of its inputs in the encoded matrix:
+        the template features, the predicted price after them, then the dimension IDs.
+        """
+        if not hasattr(model, "get_cat_feature_indices"):
+            info["sellTimeScorer"] = "estimator"
+            return model
+        if categorical_features:
+            price_column = len(features)
+            numeric_columns = [price_column if feature == "Predicted_Log_Price" else features.index(feature)
+                               for feature in sell_time_features if feature not in categorical_features]
+            categorical_columns = [price_column + 1 + i for i in range(len(categorical_features))]
+            info["sellTimeScorer"] = "catboost"
+            return CatBoostScorer(model, thread_count=self.catboost_thread_count,
+                                  numeric_columns=numeric_columns, categorical_columns=categorical_columns)
+        scorer = CatBoostScorer.compile(model, self.max_compiled_rows, self.catboost_thread_count)
+        info["sellTimeScorer"] = "compiled" if scorer.trees is not None else "catboost"
+        return scorer
+
+    def _swap(self, models: ModelSet):
+        self._current = models
+        if self.on_swap:
+            self.on_swap(models)
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Load, warm up and swap in the version on disk if it differs from the serving one.
+        Returns True if a new set was swapped in. Raises if the new version fails to load.
+        """
+        with self._lock:
+            signature = self.signature()
+            if not force and (signature == self._current.signature or signature == self._failed_signature):
+                return False
+
+            try:
+                models = self._load(signature)
+                if self.build_encoder:
+                    models = models.with_encoder(self.build_encoder(models.features, models.categorical_features))
+                if self.warm_up and models.price_model is not None:
+                    self.warm_up(models)
+            except Exception as e:
+                self._failed_signature = signature
+                self.failures += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                raise
+
+            self._failed_signature = None
+            self.last_error = None
+            self.reloads += 1
+            self.loaded_at = datetime.utcnow()
+            self._swap(models)
+            return True
+
+    def rebuild_encoder(self):
+        """
+        Recompile the encoder of the serving set, e.g. after the dimension tables were refreshed.
+        """
+        if not self.build_encoder:
+            return
+        with self._lock:
+            models = self._current
+            self._swap(models.with_encoder(self.build_encoder(models.features, models.categorical_features)))
+
+    async def watch(self, interval: float):
+        """
+        Check the model directory every interval seconds and reload when a new version appears.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if await asyncio.to_thread(self.reload):
+                    print(f"Loaded model version {self._current.version}")
+            except Exception as e:
+                print(f"Error loading models: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the serving version and the reload history.
+        """
+        return {
+            **self._current.info,
+            "loadedAt": self.loaded_at.isoformat() if self.loaded_at else None,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "lastError": self.last_error,
+        }
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The API modules import each other by name from the API directory
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
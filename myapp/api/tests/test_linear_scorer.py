@@ -0,0 +1,40 @@
+"""
+Checks that LinearScorer returns exactly the predictions of the sklearn linear models it replaces.
+
+Usage (from myapp/api):
+    python -m pytest tests
+"""
+
+import numpy as np
+import pytest
+from sklearn.linear_model import ElasticNet, LinearRegression
+
+from linear_scorer import LinearScorer
+
+@pytest.fixture
+def training_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(500, 54))
+    y = X @ rng.normal(size=54) * 1000 + 30000 + rng.normal(scale=100, size=500)
+    return X, y
+
+@pytest.mark.parametrize("estimator", [ElasticNet(alpha=0.1, max_iter=10000), LinearRegression()])
+def test_scorer_matches_estimator(training_data, estimator):
+    estimator.fit(*training_data)
+    scorer = LinearScorer.from_estimator(estimator)
+
+    rng = np.random.default_rng(1)
+    for rows in (1, 7, 1024):
+        X = rng.normal(scale=1000, size=(rows, 54))
+        np.testing.assert_array_equal(scorer.predict(X), estimator.predict(X))
+
+    # The API scores a view of the encoded matrix without its trailing column
+    X = rng.integers(0, 2, size=(64, 55)).astype(np.float64)[:, :-1]
+    np.testing.assert_array_equal(scorer.predict(X), estimator.predict(X))
+    assert scorer.matches(estimator)
+
+def test_scorer_rejects_multi_output_models(training_data):
+    X, y = training_data
+    estimator = LinearRegression().fit(X, np.column_stack([y, -y]))
+    with pytest.raises(ValueError):
+        LinearScorer.from_estimator(estimator)
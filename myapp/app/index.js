@@ -41,30 +41,23 @@ const populateSelect = (select, options) => {
     }
 }
 
-const populateAllPossibleSelects = async () => {
-    const makeOptions = await optionsService.getMakeOptions();
-    populateSelect(makeSelect, makeOptions)
-
-    const transmissionOptions = await optionsService.getTransmissionOptions();
-    populateSelect(transmissionSelect, transmissionOptions)
-
-    const fuelTypeOptions = await optionsService.getFuelTypeOptions();
-    populateSelect(fueltypeSelect, fuelTypeOptions)
+// Models of every make, filled from the /options payload
+let modelsByMake = {};
 
-    const bodyStyleOptions = await optionsService.getBodyStyleOptions();
-    populateSelect(bodyStyleSelect, bodyStyleOptions)
-
-    const colorOptions = await optionsService.getColorOptions();
-    populateSelect(colorSelect, colorOptions)
+const populateAllPossibleSelects = async () => {
+    const allOptions = await optionsService.getAllOptions();
 
-    const carOptionOptions = await optionsService.getCarOptionOptions();
-    populateSelect(optionSelect, carOptionOptions)
+    populateSelect(makeSelect, allOptions.makes)
+    modelsByMake = Object.fromEntries(allOptions.makes.map(make => [make.id, make.models]))
 
-    const damageOptions = await optionsService.getDamageOptions();
-    populateSelect(damageSelect, damageOptions)
+    populateSelect(transmissionSelect, allOptions.transmissions)
+    populateSelect(fueltypeSelect, allOptions.fuelTypes)
+    populateSelect(bodyStyleSelect, allOptions.bodyStyles)
+    populateSelect(colorSelect, allOptions.colors)
+    populateSelect(optionSelect, allOptions.carOptions)
+    populateSelect(damageSelect, allOptions.damages)
 }
 
-
 const showPredictionResults = (predictionResults) => {
     noResultText.classList.add("hidden");
     resultsDiv.classList.remove("hidden");
@@ -129,7 +122,7 @@ const handleMakeSelectChage = async () => {
     keepOnlyDefaulOption(modelSelect);
 
     makeId = makeSelect.value;
-    const modelOptions = await optionsService.getModelOptions(makeId);
+    const modelOptions = modelsByMake[makeId] || await optionsService.getModelOptions(makeId);
     populateSelect(modelSelect, modelOptions)
 }
 
@@ -3,6 +3,16 @@ class OptionsService {
         this.url = "http://localhost:8008/"
     }
 
+    getAllOptions = () => {
+        return new Promise((resolve, reject) => {
+            fetch(this.url + "options").then(resp => resp.json()).then(data => {
+                resolve(data)
+            }).catch(err => {
+                reject(err)
+            })
+        })
+    }
+
     getMakeOptions = () => {
         return new Promise((resolve, reject) => {
             fetch(this.url + "make-options").then(resp => resp.json()).then(data => {
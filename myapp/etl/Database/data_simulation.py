@@ -1,53 +1,67 @@
-from faker import Faker
+import numpy as np
 import pandas as pd
-import random
 from loguru import logger
+from Database.storage import read_frame, write_frame
 
-# Initialize Faker
-fake = Faker()
+# Values of every generated categorical column, with their probabilities (None for uniform)
+DEFAULT_DISTRIBUTIONS = {
+    "Color": (["black", "white", "silver", "red", "blue", "beige"], None),
+    "Damage": (["Total", "None", "Low", "Medium"], None),
+    "Body_style": (["Sedan", "SUV", "Hatchback", "Convertible", "Coupe", "Wagon", "Van", "Truck"], None),
+    "Fuel_type": (["Gasoline", "Diesel", "Electric", "Hybrid", "Plug-in Hybrid"], None),
+}
 
-# Define data generation functions for additional columns
-def generate_color():
-    """Generates a random car color."""
-    return random.choice(["black", "white", "silver", "red", "blue", "beige"])
+# Inclusive ranges of every generated integer column
+DEFAULT_RANGES = {
+    "Num_of_prev_owners": (1, 5),
+    "Estimated_price": (4000, 120000),
+}
 
-def generate_body_style():
-    """Generates a random car body style."""
-    return random.choice(["Sedan", "SUV", "Hatchback", "Convertible", "Coupe", "Wagon", "Van", "Truck"])
+# Function to augment a DataFrame with the generated columns
+def augment_frame(df, rng=None, seed=None, distributions=None):
+    """
+    Adds the generated columns to a DataFrame of base data, in place, and returns it.
+    Every column is filled with a single draw from a numpy Generator, so the output
+    is reproducible for a given seed. Categorical columns are stored as pandas categoricals.
+
+    Parameters:
+    - df (pd.DataFrame): Base data.
+    - rng (np.random.Generator): Generator to draw from. Created from seed if omitted.
+    - seed (int): Seed of the generator created when rng is omitted.
+    - distributions (dict): Column -> (values, probabilities) overriding DEFAULT_DISTRIBUTIONS.
 
-def generate_fuel_type():
-    """Generates a random fuel type."""
-    return random.choice(["Gasoline", "Diesel", "Electric", "Hybrid", "Plug-in Hybrid"])
+    Returns:
+    - pd.DataFrame: The augmented DataFrame.
+    """
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    distributions = {**DEFAULT_DISTRIBUTIONS, **(distributions or {})}
+    n = len(df)
 
-def generate_num_of_prev_owners():
-    """Generates a random number of previous owners."""
-    return random.randint(1, 5)
+    for column, (values, probabilities) in distributions.items():
+        codes = rng.choice(len(values), size=n, p=probabilities)
+        df[column] = pd.Categorical.from_codes(codes, categories=values)
 
-def generate_damage():
-    return random.choice(["Total", "None", "Low", "Medium"])
+    for column, (low, high) in DEFAULT_RANGES.items():
+        df[column] = rng.integers(low, high + 1, size=n)
 
-def generate_estimated_price():
-    """Generates an estimated price for the car."""
-    return random.randint(4000, 120000)
+    return df
 
 # Function to load base data and augment with new columns
-def augment_data(base_path, output_path):
+def augment_data(base_path, output_path, seed=None, distributions=None):
     """
-    Loads the base CSV file, generates additional columns,
-    and saves the augmented data to a new CSV.
+    Loads the base file, generates additional columns,
+    and saves the augmented data to a new file.
+    Both files can be CSV or Parquet, depending on their extension.
+    The seed and distributions are passed to augment_frame.
     """
     logger.info("Loading base data")
-    base_df = pd.read_csv(base_path)
+    base_df = read_frame(base_path)
 
     logger.info("Generating new columns")
-    base_df["Color"] = [generate_color() for _ in range(len(base_df))]
-    base_df["Damage"] = [generate_damage() for _ in range(len(base_df))]
-    base_df["Body_style"] = [generate_body_style() for _ in range(len(base_df))]
-    base_df["Fuel_type"] = [generate_fuel_type() for _ in range(len(base_df))]
-    base_df["Num_of_prev_owners"] = [generate_num_of_prev_owners() for _ in range(len(base_df))]
-    base_df["Estimated_price"] = [generate_estimated_price() for _ in range(len(base_df))]
-
-    logger.info("Saving augmented data to CSV")
-    base_df.to_csv(output_path, index=False)
+    augment_frame(base_df, seed=seed, distributions=distributions)
+
+    logger.info(f"Saving augmented data to {output_path}")
+    write_frame(base_df, output_path)
     logger.info(f"Augmented data saved to {output_path}")
     return output_path
@@ -1,8 +1,20 @@
 from sqlalchemy import (
-    Column, Integer, String, Float, Date, ForeignKey
+    Column, Integer, String, Float, Date, ForeignKey, Index, text
 )
 from sqlalchemy.orm import relationship
 from .database import Base, engine
+from datetime import date
+import os
+
+# Optional range partitioning of the Cars table by Website_post_date: "none", "month" or "year".
+# It only applies when the table is created; partitions cover CARS_PARTITION_FROM to CARS_PARTITION_TO,
+# and rows outside that range go to a default partition.
+CARS_PARTITION_BY = os.getenv("CARS_PARTITION_BY", "none")
+CARS_PARTITION_FROM = date.fromisoformat(os.getenv("CARS_PARTITION_FROM", "2022-01-01"))
+CARS_PARTITION_TO = date.fromisoformat(os.getenv("CARS_PARTITION_TO", "2026-01-01"))
+if CARS_PARTITION_BY not in ("none", "month", "year"):
+    raise ValueError(f"CARS_PARTITION_BY must be none, month or year, not {CARS_PARTITION_BY}")
+PARTITIONED = CARS_PARTITION_BY != "none"
 
 # Dimension Tables
 
@@ -73,7 +85,7 @@ class Damage(Base):
 class Cars(Base):
     __tablename__ = "Cars"
 
-    ID = Column(Integer, primary_key=True, index=True)
+    ID = Column(Integer, primary_key=True, index=True, autoincrement=True)
     Model_ID = Column(Integer, ForeignKey("Model.ID"), nullable=False)
     Fuel_type_ID = Column(Integer, ForeignKey("Fuel_type.ID"), nullable=False)
     Color_ID = Column(Integer, ForeignKey("Color.ID"), nullable=False)
@@ -86,10 +98,31 @@ class Cars(Base):
     Year = Column(Integer, nullable=False)
     Mileage = Column(Float, nullable=False)
     Horsepower = Column(Float, nullable=False)
-    Website_post_date = Column(Date, nullable=False)
+    # Partitioned tables need the partition key in their primary key
+    Website_post_date = Column(Date, nullable=False, primary_key=PARTITIONED)
     Sell_date = Column(Date, nullable=True)
     Num_of_prev_owners = Column(Integer, nullable=False)
     Estimated_price = Column(Float, nullable=False)
+    # Hash of the columns identifying a listing in the source data, used for incremental loads
+    Source_key = Column(String(32), nullable=True)
+
+    __table_args__ = (
+        Index("uq_cars_source_key", "Source_key", "Website_post_date", unique=True),
+        # Lookups by make, model and year; also serves the Car_make_ID foreign key
+        Index("ix_cars_make_model_year", "Car_make_ID", "Model_ID", "Year"),
+        # Foreign keys, for joins and filters on a single dimension
+        Index("ix_cars_model_id", "Model_ID"),
+        Index("ix_cars_fuel_type_id", "Fuel_type_ID"),
+        Index("ix_cars_color_id", "Color_ID"),
+        Index("ix_cars_body_style_id", "Body_style_ID"),
+        Index("ix_cars_transmission_id", "Transmission_ID"),
+        Index("ix_cars_options_id", "Options_ID"),
+        Index("ix_cars_damage_id", "Damage_ID"),
+        # Date ranges of listings and sales
+        Index("ix_cars_website_post_date", "Website_post_date"),
+        Index("ix_cars_sell_date", "Sell_date"),
+        {"postgresql_partition_by": 'RANGE ("Website_post_date")'} if PARTITIONED else {},
+    )
 
     # Relationships
     model = relationship("Model")
@@ -101,5 +134,46 @@ class Cars(Base):
     damage = relationship("Damage")
     car_make = relationship("CarMake")
 
+def partition_bounds(table_name, start, end, interval):
+    """
+    Return the name, lower bound and upper bound of every monthly or yearly partition of a table
+    covering start to end.
+    """
+    bounds = []
+    lower = date(start.year, start.month if interval == "month" else 1, 1)
+    while lower < end:
+        if interval == "month":
+            upper = date(lower.year + lower.month // 12, lower.month % 12 + 1, 1)
+            name = f"{table_name}_{lower:%Y_%m}"
+        else:
+            upper = date(lower.year + 1, 1, 1)
+            name = f"{table_name}_{lower:%Y}"
+        bounds.append((name, lower, upper))
+        lower = upper
+    return bounds
+
+def create_partitions(connection):
+    """
+    Create the missing partitions of a partitioned Cars table, then its default partition.
+    """
+    for name, lower, upper in partition_bounds("Cars", CARS_PARTITION_FROM, CARS_PARTITION_TO, CARS_PARTITION_BY):
+        connection.execute(text(
+            f"""CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "Cars" FOR VALUES FROM ('{lower}') TO ('{upper}')"""
+        ))
+    connection.execute(text('CREATE TABLE IF NOT EXISTS "Cars_default" PARTITION OF "Cars" DEFAULT'))
+
 # Create all tables
 Base.metadata.create_all(engine)
+
+with engine.begin() as connection:
+    # Add the incremental load key to Cars tables created before it existed
+    connection.execute(text('ALTER TABLE "Cars" ADD COLUMN IF NOT EXISTS "Source_key" VARCHAR(32)'))
+    # Add the indexes to Cars tables created before them
+    for index in Cars.__table__.indexes:
+        index.create(connection, checkfirst=True)
+
+    if PARTITIONED:
+        if connection.execute(text("""SELECT 1 FROM pg_partitioned_table WHERE partrelid = '"Cars"'::regclass""")).scalar():
+            create_partitions(connection)
+        else:
+            print("CARS_PARTITION_BY is ignored: the Cars table already exists and is not partitioned")
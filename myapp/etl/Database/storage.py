@@ -0,0 +1,147 @@
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Dimension string columns, stored as categoricals
+CATEGORICAL_COLUMNS = ["Car_make", "Model", "Transmission", "Options", "Color", "Damage", "Body_style", "Fuel_type"]
+
+# Date columns, stored as real dates instead of strings
+DATE_COLUMNS = ["Website_post_date", "Sell_date"]
+
+# Integer columns with the narrowest width that fits their values
+INTEGER_COLUMNS = {
+    "ID": "int32",
+    "Car_make_id": "int16",
+    "Model_id": "int16",
+    "Fuel_type_id": "int16",
+    "Color_id": "int16",
+    "Body_style_id": "int16",
+    "Transmission_id": "int16",
+    "Options_id": "int16",
+    "Damage_id": "int16",
+    "Year": "int16",
+    "Mileage": "int32",
+    "Horsepower": "int16",
+    "Num_of_prev_owners": "int8",
+    "Estimated_price": "int32",
+}
+
+PARQUET_SUFFIX = ".parquet"
+
+
+def is_parquet(path):
+    """Returns True if the path points to a Parquet file."""
+    return os.path.splitext(path)[1] == PARQUET_SUFFIX
+
+
+def with_format(path, file_format):
+    """
+    Returns the path with the extension of the given format ("csv" or "parquet").
+    """
+    return os.path.splitext(path)[0] + "." + file_format
+
+
+def to_typed_frame(df):
+    """
+    Converts the known columns of a DataFrame, in place, to their compact types:
+    categoricals with sorted categories for the dimension strings, datetimes for the
+    dates and narrow integers for the counts. Other columns are left untouched.
+    """
+    for column in CATEGORICAL_COLUMNS:
+        if column in df:
+            if isinstance(df[column].dtype, pd.CategoricalDtype):
+                categories = df[column].cat.remove_unused_categories()
+                df[column] = categories.cat.reorder_categories(sorted(categories.cat.categories))
+            else:
+                df[column] = df[column].astype("category")
+
+    for column in DATE_COLUMNS:
+        if column in df and not pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = pd.to_datetime(df[column], format="%Y-%m-%d")
+
+    for column, dtype in INTEGER_COLUMNS.items():
+        if column in df:
+            df[column] = df[column].astype(dtype)
+
+    return df
+
+
+def read_frame(path, columns=None):
+    """
+    Loads a CSV or Parquet file into a typed DataFrame.
+    Parquet files are memory-mapped and only the requested columns are read.
+
+    Parameters:
+    - path (str): Path of the file; the format is taken from its extension.
+    - columns (list): Columns to read. Reads every column if omitted.
+
+    Returns:
+    - pd.DataFrame: The typed data.
+    """
+    if is_parquet(path):
+        return pd.read_parquet(path, columns=columns, memory_map=True)
+
+    # Only empty cells are missing values; "None" is a valid Damage level
+    df = pd.read_csv(path, usecols=columns, keep_default_na=False, na_values=[""])
+    return to_typed_frame(df)
+
+
+def iter_frames(path, chunk_size, columns=None):
+    """
+    Yields a CSV or Parquet file as typed DataFrames of at most chunk_size rows.
+    """
+    if is_parquet(path):
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+        return
+
+    chunks = pd.read_csv(path, usecols=columns, chunksize=chunk_size, keep_default_na=False, na_values=[""])
+    for chunk in chunks:
+        yield to_typed_frame(chunk)
+
+
+class FrameWriter:
+    """
+    Appends DataFrames to a CSV or Parquet file, e.g. one chunk at a time in streaming mode.
+    Every chunk of a Parquet file is cast to the schema of the first one.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._parquet_writer = None
+
+    def write(self, df):
+        if is_parquet(self.path):
+            table = pa.Table.from_pandas(to_typed_frame(df), preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table.cast(self._parquet_writer.schema))
+        else:
+            df.to_csv(self.path, mode="w" if self.rows == 0 else "a", header=self.rows == 0, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_frame(df, path):
+    """
+    Saves a DataFrame as CSV or Parquet, depending on the extension of the path.
+    Parquet files are written with their compact types.
+    """
+    if is_parquet(path):
+        to_typed_frame(df).to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
@@ -0,0 +1,335 @@
+"""
+ETL Benchmarks
+This script measures the throughput of the ETL pipeline against the configured database.
+
+Benchmarks:
+- parallel: Runs the parallel pipeline (augmentation, ID mapping and optionally COPY loading)
+  on a synthetic input with 1 to N worker processes and reports the rows/sec and the speedup
+  over a single worker. Loads go to a scratch copy of the Cars table that is dropped afterwards.
+- queries: Builds scratch fact tables of the given size by repeating the rows of Cars, in three
+  layouts (no secondary indexes, the indexes of the Cars model, and those indexes on a table
+  range-partitioned by Website_post_date), and times representative analytics and training queries
+  on each. It also reports the time spent loading the rows and building the indexes.
+
+Usage:
+    python benchmark.py parallel --rows 1000000 --max-workers 16 --load
+    python benchmark.py queries --rows 1000000 --repeats 5 --partition-by month
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+import pandas as pd
+from loguru import logger
+from Database.database import SessionLocal
+from Database.models import Cars, partition_bounds
+from etl import (
+    BASE_CSV_PATH, FACT_COLUMNS, TABLE_NAME, STREAM_CHUNK_SIZE, get_connection, get_dimension_mappings,
+    populate_dimension_tables_bulk, run_parallel_pipeline,
+)
+
+BENCHMARK_TABLE_NAME = "Cars_benchmark"
+QUERY_LAYOUTS = ("plain", "indexed", "partitioned")
+
+# Representative queries on the fact table, formatted with the table name
+QUERIES = {
+    # Training extract and price lookups of one make, model and year
+    "make_model_year": """
+        SELECT count(*), avg("Estimated_price") FROM "{table}"
+        WHERE "Car_make_ID" = %(make)s AND "Model_ID" = %(model)s AND "Year" = %(year)s
+    """,
+    # Listings of one model posted in one month
+    "model_month": """
+        SELECT "ID", "Mileage", "Estimated_price" FROM "{table}"
+        WHERE "Model_ID" = %(model)s AND "Website_post_date" >= %(month_start)s AND "Website_post_date" < %(month_end)s
+    """,
+    # Monthly report joined with a dimension table
+    "month_by_make": """
+        SELECT make.car_make, count(*), avg(cars."Estimated_price") FROM "{table}" AS cars
+        JOIN "Car_make" AS make ON make."ID" = cars."Car_make_ID"
+        WHERE cars."Website_post_date" >= %(month_start)s AND cars."Website_post_date" < %(month_end)s
+        GROUP BY make.car_make
+    """,
+    # Sales of one week
+    "sold_in_week": """
+        SELECT count(*), avg("Sell_date" - "Website_post_date") FROM "{table}"
+        WHERE "Sell_date" >= %(week_start)s AND "Sell_date" < %(week_end)s
+    """,
+    # Aggregate over the whole history, which no index can narrow down
+    "days_to_sell_by_model": """
+        SELECT "Model_ID", avg("Sell_date" - "Website_post_date") FROM "{table}"
+        WHERE "Sell_date" IS NOT NULL GROUP BY "Model_ID"
+    """,
+}
+
+def make_synthetic_csv(rows, path):
+    """
+    Write a CSV with the given number of rows by repeating the base data.
+    The mileage of every repetition is shifted so that each row is a distinct listing.
+
+    Parameters:
+    - rows (int): Number of rows to write.
+    - path (str): Path of the CSV file.
+
+    Returns:
+    - str: The path of the CSV file.
+    """
+    base_df = pd.read_csv(BASE_CSV_PATH, keep_default_na=False, na_values=[""])
+    repeats = -(-rows // len(base_df))
+    synthetic_df = pd.concat([base_df.assign(Mileage=base_df["Mileage"] + i) for i in range(repeats)], ignore_index=True)
+    synthetic_df.iloc[:rows].to_csv(path, index=False)
+    return path
+
+def worker_counts(max_workers):
+    """
+    Return 1, 2, 4, ... up to max_workers, always including max_workers.
+    """
+    counts = []
+    workers = 1
+    while workers < max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(max_workers)
+    return counts
+
+def benchmark_parallel(rows, max_workers, chunk_size, load):
+    """
+    Time the parallel pipeline with an increasing number of workers.
+
+    Parameters:
+    - rows (int): Number of input rows.
+    - max_workers (int): Highest number of workers to try.
+    - chunk_size (int): Number of rows per partition.
+    - load (bool): Also copy the rows into a scratch table.
+
+    Returns:
+    - list: One (workers, seconds, rows per second, speedup) tuple per run.
+    """
+    session = SessionLocal()
+    conn = get_connection()
+    try:
+        populate_dimension_tables_bulk(session)
+        mappings = get_dimension_mappings(session)
+
+        if load:
+            with conn.cursor() as cursor:
+                cursor.execute(f'DROP TABLE IF EXISTS "{BENCHMARK_TABLE_NAME}"')
+                cursor.execute(f'CREATE TABLE "{BENCHMARK_TABLE_NAME}" (LIKE "{TABLE_NAME}" INCLUDING ALL)')
+            conn.commit()
+
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path = make_synthetic_csv(rows, os.path.join(directory, "benchmark.csv"))
+
+            results = []
+            for workers in worker_counts(max_workers):
+                if load:
+                    with conn.cursor() as cursor:
+                        cursor.execute(f'TRUNCATE "{BENCHMARK_TABLE_NAME}"')
+                    conn.commit()
+
+                start = time.perf_counter()
+                run_parallel_pipeline(csv_path, mappings, workers, chunk_size=chunk_size, seed=0,
+                                      table_name=BENCHMARK_TABLE_NAME, load=load)
+                elapsed = time.perf_counter() - start
+
+                speedup = results[0][1] / elapsed if results else 1.0
+                results.append((workers, elapsed, rows / elapsed, speedup))
+                logger.info(f"{workers:>3} workers: {elapsed:7.2f}s {rows / elapsed:>12,.0f} rows/s  x{speedup:.2f}")
+
+        return results
+    finally:
+        if load:
+            with conn.cursor() as cursor:
+                cursor.execute(f'DROP TABLE IF EXISTS "{BENCHMARK_TABLE_NAME}"')
+            conn.commit()
+        conn.close()
+        session.close()
+
+def query_parameters(conn):
+    """
+    Pick the parameters of the benchmark queries from the Cars table: its most common make, model
+    and year, the month in the middle of its posting dates and the first week of its sales.
+
+    Returns:
+    - dict: The query parameters.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT "Car_make_ID", "Model_ID", "Year" FROM "{TABLE_NAME}"
+            GROUP BY 1, 2, 3 ORDER BY count(*) DESC, 1, 2, 3 LIMIT 1
+        """)
+        make, model, year = cursor.fetchone()
+        cursor.execute(f'SELECT min("Website_post_date"), max("Website_post_date"), min("Sell_date") FROM "{TABLE_NAME}"')
+        first_post, last_post, first_sale = cursor.fetchone()
+    middle = first_post + (last_post - first_post) / 2
+    month_start = middle.replace(day=1)
+    return {
+        "make": make, "model": model, "year": year,
+        "month_start": month_start, "month_end": (month_start + timedelta(days=32)).replace(day=1),
+        "week_start": first_sale, "week_end": first_sale + timedelta(days=7),
+    }
+
+def create_benchmark_table(conn, table_name, layout, partition_by):
+    """
+    Create an empty copy of the Cars columns, range-partitioned by Website_post_date for the
+    partitioned layout, with partitions covering the posting dates of Cars and a default partition.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+        if layout != "partitioned":
+            cursor.execute(f'CREATE TABLE "{table_name}" (LIKE "{TABLE_NAME}" INCLUDING DEFAULTS)')
+        else:
+            cursor.execute(f'CREATE TABLE "{table_name}" (LIKE "{TABLE_NAME}" INCLUDING DEFAULTS) PARTITION BY RANGE ("Website_post_date")')
+            cursor.execute(f'SELECT min("Website_post_date"), max("Website_post_date") FROM "{TABLE_NAME}"')
+            first_post, last_post = cursor.fetchone()
+            for name, lower, upper in partition_bounds(table_name, first_post, last_post + timedelta(days=1), partition_by):
+                cursor.execute(f"""CREATE TABLE "{name}" PARTITION OF "{table_name}" FOR VALUES FROM ('{lower}') TO ('{upper}')""")
+            cursor.execute(f'CREATE TABLE "{table_name}_default" PARTITION OF "{table_name}" DEFAULT')
+    conn.commit()
+
+def fill_benchmark_table(conn, table_name, rows):
+    """
+    Insert the given number of rows by repeating the rows of Cars. The mileage of every repetition
+    is shifted and the source keys are left empty, so that each row is a distinct listing.
+    """
+    columns = [column for column in FACT_COLUMNS if column not in ("ID", "Mileage", "Source_key")]
+    inserted = ", ".join(f'"{column}"' for column in columns)
+    selected = ", ".join(f'cars."{column}"' for column in columns)
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+            INSERT INTO "{table_name}" ("ID", "Mileage", {inserted})
+            SELECT row_number() OVER (), cars."Mileage" + copies.n, {selected}
+            FROM "{TABLE_NAME}" AS cars
+            CROSS JOIN generate_series(0, (%(rows)s - 1) / (SELECT count(*) FROM "{TABLE_NAME}")) AS copies(n)
+            LIMIT %(rows)s
+        """, {"rows": rows})
+    conn.commit()
+
+def create_benchmark_indexes(conn, table_name):
+    """
+    Create the non-unique indexes of the Cars model on a benchmark table, then refresh its statistics.
+    """
+    with conn.cursor() as cursor:
+        for index in Cars.__table__.indexes:
+            if not index.unique:
+                columns = ", ".join(f'"{column.name}"' for column in index.columns)
+                cursor.execute(f'CREATE INDEX ON "{table_name}" ({columns})')
+        cursor.execute(f'ANALYZE "{table_name}"')
+    conn.commit()
+
+def time_query(conn, query, parameters, repeats):
+    """
+    Run a query once to warm the cache, then repeats times.
+
+    Returns:
+    - float: The median time of a run in milliseconds.
+    """
+    timings = []
+    with conn.cursor() as cursor:
+        for i in range(repeats + 1):
+            start = time.perf_counter()
+            cursor.execute(query, parameters)
+            cursor.fetchall()
+            if i:
+                timings.append((time.perf_counter() - start) * 1000)
+    conn.rollback()
+    return statistics.median(timings)
+
+def benchmark_queries(rows, repeats, partition_by):
+    """
+    Time the representative queries on a fact table without secondary indexes, with the indexes of
+    the Cars model, and with those indexes on a partitioned table.
+
+    Parameters:
+    - rows (int): Number of rows of every benchmark table.
+    - repeats (int): Number of timed runs of every query.
+    - partition_by (str): Range of the partitions, "month" or "year".
+
+    Returns:
+    - dict: Layout -> seconds of the load ("load"), of the index build ("index") and of a load with the indexes
+      in place ("indexedLoad"), size in MB ("sizeMb") and the median milliseconds of every query.
+    """
+    conn = get_connection()
+    try:
+        parameters = query_parameters(conn)
+        results = {}
+        for layout in QUERY_LAYOUTS:
+            table_name = f"{BENCHMARK_TABLE_NAME}_{layout}"
+            create_benchmark_table(conn, table_name, layout, partition_by)
+            try:
+                result = {}
+                start = time.perf_counter()
+                fill_benchmark_table(conn, table_name, rows)
+                result["load"] = time.perf_counter() - start
+                if layout != "plain":
+                    start = time.perf_counter()
+                    create_benchmark_indexes(conn, table_name)
+                    result["index"] = time.perf_counter() - start
+                else:
+                    with conn.cursor() as cursor:
+                        cursor.execute(f'ANALYZE "{table_name}"')
+                    conn.commit()
+
+                with conn.cursor() as cursor:
+                    # pg_partition_tree returns no rows for a table that is not partitioned
+                    cursor.execute("""
+                        SELECT coalesce((SELECT sum(pg_total_relation_size(relid)) FROM pg_partition_tree(%(table)s::regclass)),
+                                        pg_total_relation_size(%(table)s::regclass))
+                    """, {"table": f'"{table_name}"'})
+                    result["sizeMb"] = cursor.fetchone()[0] / 2**20
+                conn.commit()
+                for name, query in QUERIES.items():
+                    result[name] = time_query(conn, query.format(table=table_name), parameters, repeats)
+
+                # Load again with the indexes in place, as without --drop-indexes
+                if layout != "plain":
+                    with conn.cursor() as cursor:
+                        cursor.execute(f'TRUNCATE "{table_name}"')
+                    conn.commit()
+                    start = time.perf_counter()
+                    fill_benchmark_table(conn, table_name, rows)
+                    result["indexedLoad"] = time.perf_counter() - start
+                results[layout] = result
+            finally:
+                with conn.cursor() as cursor:
+                    cursor.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+                conn.commit()
+
+            if layout == "plain":
+                logger.info(f"{layout:>12}: loaded {rows} rows in {result['load']:.2f}s, {result['sizeMb']:.0f} MB")
+            else:
+                logger.info(f"{layout:>12}: loaded {rows} rows in {result['load']:.2f}s and built the indexes in {result['index']:.2f}s, "
+                            f"{result['indexedLoad']:.2f}s loading with the indexes in place, {result['sizeMb']:.0f} MB")
+
+        logger.info(f"{'query (ms)':>22}" + "".join(f"{layout:>14}" for layout in QUERY_LAYOUTS))
+        for name in QUERIES:
+            logger.info(f"{name:>22}" + "".join(f"{results[layout][name]:>14.2f}" for layout in QUERY_LAYOUTS))
+        return results
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the car sales ETL process.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    parallel_parser = subparsers.add_parser("parallel", help="Scaling of the parallel pipeline from 1 to N workers.")
+    parallel_parser.add_argument("--rows", type=int, default=1_000_000, help="Number of synthetic input rows.")
+    parallel_parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1,
+                                 help="Highest number of workers to try.")
+    parallel_parser.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_SIZE, help="Rows per partition.")
+    parallel_parser.add_argument("--load", action="store_true", help="Also copy the rows into a scratch table.")
+
+    queries_parser = subparsers.add_parser("queries", help="Representative queries with and without indexes and partitions.")
+    queries_parser.add_argument("--rows", type=int, default=1_000_000, help="Number of rows of every benchmark table.")
+    queries_parser.add_argument("--repeats", type=int, default=5, help="Number of timed runs of every query.")
+    queries_parser.add_argument("--partition-by", choices=["month", "year"], default="month",
+                                help="Range of the partitions of the partitioned layout.")
+
+    args = parser.parse_args()
+    if args.benchmark == "parallel":
+        benchmark_parallel(args.rows, args.max_workers, args.chunk_size, args.load)
+    elif args.benchmark == "queries":
+        benchmark_queries(args.rows, args.repeats, args.partition_by)
@@ -17,16 +17,25 @@ Predefined tables:
 - CarMake, Model, FuelType, Color, BodyStyle, Transmission, Option, Damage, Cars.
 """
 
+import argparse
+import io
+import os
+import time
 import traceback
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 import pandas as pd
 from sqlalchemy.orm import Session
-from Database.database import engine, SessionLocal
+from Database.database import engine, SessionLocal, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME
 from Database.models import (
     CarMake, Model, FuelType, Color, BodyStyle, Transmission, Option, Damage, Cars
 )
-from Database.data_simulation import augment_data
+from Database.data_simulation import augment_data, augment_frame
+from Database.storage import FrameWriter, iter_frames, read_frame, to_typed_frame, with_format, write_frame
 from loguru import logger
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 import psycopg2
 from psycopg2.extras import execute_batch
 import numpy as np
@@ -38,6 +47,21 @@ AUGMENTED_CSV_PATH = CSV_FOLDER + "car_sales_augmented.csv"  # Augmented CSV fil
 FACT_CSV_PATH = CSV_FOLDER + "car_sales_fact.csv"  # Fact table CSV file path
 TABLE_NAME = "Cars"
 
+# Columns of the Cars fact table, in the order of the fact DataFrame
+FACT_COLUMNS = [
+    "ID", "Car_make_ID", "Model_ID", "Fuel_type_ID", "Color_ID",
+    "Body_style_ID", "Transmission_ID", "Options_ID", "Damage_ID",
+    "Year", "Mileage", "Horsepower", "Website_post_date",
+    "Sell_date", "Num_of_prev_owners", "Estimated_price", "Source_key",
+]
+
+# Source columns identifying a listing; Sell_date is left out as it changes once the car is sold
+SOURCE_KEY_COLUMNS = [
+    "Car_make", "Model", "Mileage", "Transmission", "Year", "Website_post_date", "Options", "Horsepower",
+]
+COPY_CHUNK_SIZE = 100_000  # Rows sent per COPY statement
+STREAM_CHUNK_SIZE = 50_000  # Base rows processed per chunk in streaming mode
+
 # Predefined Values
 CAR_MAKE = ["Audi", "BMW", "Chevrolet", "Ford", "Mercedes-Benz", "Toyota"]
 MODELS = {
@@ -55,6 +79,17 @@ TRANSMISSIONS = ["Automatic", "Manual"]
 OPTIONS = ["Base", "Advanced", "Luxe", "Full"]
 DAMAGES = ["Total", "None", "Low", "Medium"]
 
+# Dimension tables keyed on their column in the augmented data, with their name column and predefined values
+DIMENSION_TABLES = {
+    "Fuel_type": (FuelType, "fuel_type", FUEL_TYPES),
+    "Color": (Color, "color", COLORS),
+    "Body_style": (BodyStyle, "body_style", BODY_STYLES),
+    "Transmission": (Transmission, "transmission", TRANSMISSIONS),
+    "Options": (Option, "option", OPTIONS),
+    "Damage": (Damage, "damage", DAMAGES),
+}
+DIMENSION_COLUMNS = ["Car_make", "Model", *DIMENSION_TABLES]
+
 def load_to_database(df, table_name, engine):
     """
     Load data into the specified database table using psycopg2's execute_batch.
@@ -67,15 +102,9 @@ def load_to_database(df, table_name, engine):
     Returns:
     - None
     """
+    conn = cursor = None
     try:
-        conn_params = {
-            "dbname": "cars",
-            "user": "postgres",
-            "password": "postgrespostgres",
-            "host": "postgresql_db",
-            "port": 5432,
-        }
-        conn = psycopg2.connect(**conn_params)
+        conn = get_connection()
         cursor = conn.cursor()
 
         # Ensure table name is quoted
@@ -87,9 +116,9 @@ def load_to_database(df, table_name, engine):
                 "ID", "Car_make_ID", "Model_ID", "Fuel_type_ID", "Color_ID",
                 "Body_style_ID", "Transmission_ID", "Options_ID", "Damage_ID",
                 "Year", "Mileage", "Horsepower", "Website_post_date",
-                "Sell_date", "Num_of_prev_owners", "Estimated_price"
+                "Sell_date", "Num_of_prev_owners", "Estimated_price", "Source_key"
             )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         """
 
         # Convert DataFrame to a list of tuples, ensuring native Python types
@@ -118,6 +147,136 @@ def load_to_database(df, table_name, engine):
         if conn:
             conn.close()
 
+def get_connection():
+    """
+    Open a psycopg2 connection to the database configured in the environment.
+
+    Returns:
+    - psycopg2.extensions.connection: An open connection.
+    """
+    return psycopg2.connect(
+        dbname=DB_NAME,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        host=DB_HOST,
+        port=int(DB_PORT),
+    )
+
+def copy_to_database(df, table_name, conn=None, chunk_size=COPY_CHUNK_SIZE, quiet=False):
+    """
+    Load data into the specified database table using PostgreSQL COPY FROM STDIN.
+
+    The DataFrame is serialized to CSV one chunk at a time, so no per-row Python
+    objects are built and memory stays bounded by the chunk size.
+
+    Parameters:
+    - df (pd.DataFrame): The DataFrame containing data to load, with columns in FACT_COLUMNS order.
+    - table_name (str): The name of the database table to load data into.
+    - conn (psycopg2.extensions.connection): Connection to use. A new one is opened, committed and closed if omitted.
+    - chunk_size (int): Number of rows sent per COPY statement.
+    - quiet (bool): Do not log the throughput.
+
+    Returns:
+    - int: The number of rows loaded.
+    """
+    own_connection = conn is None
+    if own_connection:
+        conn = get_connection()
+
+    columns = ", ".join(f'"{column}"' for column in FACT_COLUMNS)
+    copy_query = f"""COPY "{table_name}" ({columns}) FROM STDIN WITH (FORMAT csv, NULL '')"""
+
+    start = time.perf_counter()
+    rows = 0
+    try:
+        with conn.cursor() as cursor:
+            for offset in range(0, len(df), chunk_size):
+                chunk = df.iloc[offset:offset + chunk_size]
+                buffer = io.StringIO()
+                chunk.to_csv(buffer, index=False, header=False, date_format="%Y-%m-%d")
+                buffer.seek(0)
+                cursor.copy_expert(copy_query, buffer)
+                rows += len(chunk)
+
+        if own_connection:
+            conn.commit()
+    except Exception:
+        if own_connection:
+            conn.rollback()
+        raise
+    finally:
+        if own_connection:
+            conn.close()
+
+    elapsed = time.perf_counter() - start
+    if not quiet:
+        logger.info(f"Copied {rows} rows into {table_name} in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)")
+    return rows
+
+def drop_secondary_indexes(conn, table_name=TABLE_NAME):
+    """
+    Drop the foreign keys and the non-unique indexes of a table before a bulk load.
+    The primary key and the unique source key index are kept, so loads and upserts stay checked.
+    The indexes of a partitioned table are dropped and recreated on all its partitions.
+
+    Parameters:
+    - conn (psycopg2.extensions.connection): Open connection. The caller commits.
+    - table_name (str): The table to load.
+
+    Returns:
+    - list: The statements recreating the dropped indexes and foreign keys.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT replace(pg_get_indexdef(indexrelid), ' ON ONLY ', ' ON '), format('DROP INDEX %%s', indexrelid::regclass)
+            FROM pg_index WHERE indrelid = %(table)s::regclass AND NOT indisunique
+            UNION ALL
+            SELECT format('ALTER TABLE %%s ADD CONSTRAINT %%I %%s', conrelid::regclass, conname, pg_get_constraintdef(oid)),
+                   format('ALTER TABLE %%s DROP CONSTRAINT %%I', conrelid::regclass, conname)
+            FROM pg_constraint WHERE conrelid = %(table)s::regclass AND contype = 'f'
+        """, {"table": f'"{table_name}"'})
+        definitions = cursor.fetchall()
+        for _, drop_statement in definitions:
+            cursor.execute(drop_statement)
+    return [create_statement for create_statement, _ in definitions]
+
+def rebuild_secondary_indexes(conn, statements, table_name=TABLE_NAME):
+    """
+    Recreate the indexes and foreign keys dropped by drop_secondary_indexes, then refresh the
+    planner statistics of the table.
+
+    Parameters:
+    - conn (psycopg2.extensions.connection): Open connection. Committed once everything is rebuilt.
+    - statements (list): Statements returned by drop_secondary_indexes.
+    - table_name (str): The loaded table.
+    """
+    start = time.perf_counter()
+    with conn.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.execute(f'ANALYZE "{table_name}"')
+    conn.commit()
+    logger.info(f"Rebuilt {len(statements)} indexes and foreign keys of {table_name} in {time.perf_counter() - start:.2f}s")
+
+@contextmanager
+def secondary_indexes_dropped(table_name=TABLE_NAME):
+    """
+    Run a bulk load with the foreign keys and non-unique indexes of the table dropped, and rebuild
+    them once the load completes or fails. Building an index in one pass is cheaper than updating it
+    for every copied row, and a foreign key is validated with a single join instead of a lookup per row.
+    """
+    conn = get_connection()
+    try:
+        statements = drop_secondary_indexes(conn, table_name)
+        conn.commit()
+        logger.info(f"Dropped {len(statements)} indexes and foreign keys of {table_name} for the load")
+        try:
+            yield
+        finally:
+            rebuild_secondary_indexes(conn, statements, table_name)
+    finally:
+        conn.close()
+
 # Function to populate predefined dimension tables
 def populate_predefined_dimension_tables(session):
     """
@@ -183,6 +342,81 @@ def populate_predefined_dimension_tables(session):
         logger.error(traceback.format_exc())
         raise
 
+def insert_missing_values(session, model, column_name, rows):
+    """
+    Insert dimension rows with a single INSERT ... ON CONFLICT DO NOTHING statement.
+
+    Parameters:
+    - session (sqlalchemy.orm.Session): SQLAlchemy session for database operations.
+    - model (Base): SQLAlchemy ORM model class.
+    - column_name (str): Unique name column of the table.
+    - rows (list): Rows to insert, as dictionaries of column values.
+
+    Returns:
+    - list: The names of the newly inserted rows.
+    """
+    if not rows:
+        return []
+    statement = (
+        insert(model)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[column_name])
+        .returning(getattr(model, column_name))
+    )
+    return list(session.execute(statement).scalars())
+
+# Function to populate dimension tables with set-based statements
+def populate_dimension_tables_bulk(session, df=None):
+    """
+    Upsert the predefined values, and every value found in the incoming data, into the dimension tables.
+
+    Each table is filled with one INSERT ... ON CONFLICT DO NOTHING RETURNING statement, so existing
+    values are skipped without rolling back the rest of the work, and new makes, models or categories
+    in the data are added without code changes.
+
+    Parameters:
+    - session (sqlalchemy.orm.Session): SQLAlchemy session for database operations.
+    - df (pd.DataFrame): Incoming data with some or all of DIMENSION_COLUMNS. Only predefined values are inserted if omitted.
+
+    Returns:
+    - int: The number of newly inserted dimension values.
+    """
+    try:
+        inserted = 0
+
+        # Car makes first, since models reference them
+        makes = set(CAR_MAKE)
+        model_pairs = {(make, model) for make, models in MODELS.items() for model in models}
+        if df is not None and "Car_make" in df:
+            makes.update(df["Car_make"].dropna().unique())
+            if "Model" in df:
+                model_pairs.update(df[["Car_make", "Model"]].dropna().drop_duplicates().itertuples(index=False, name=None))
+
+        inserted += len(insert_missing_values(session, CarMake, "car_make", [{"car_make": make} for make in sorted(makes)]))
+
+        make_ids = dict(session.execute(select(CarMake.car_make, CarMake.ID)).all())
+        model_rows = [{"model": model, "Car_make_id": make_ids[make]} for make, model in sorted(model_pairs)]
+        inserted += len(insert_missing_values(session, Model, "model", model_rows))
+
+        # Other dimension tables
+        for column, (model_class, column_name, predefined) in DIMENSION_TABLES.items():
+            values = set(predefined)
+            if df is not None and column in df:
+                values.update(df[column].dropna().unique())
+            rows = [{column_name: value} for value in sorted(values)]
+            inserted += len(insert_missing_values(session, model_class, column_name, rows))
+
+        session.commit()
+        if inserted:
+            logger.info(f"Inserted {inserted} new dimension values")
+        return inserted
+
+    except Exception:
+        session.rollback()
+        logger.error("Error populating dimension tables")
+        logger.error(traceback.format_exc())
+        raise
+
 # Function to fetch mappings from dimensional tables
 def get_mapping(session, model, column_name):
     """
@@ -199,24 +433,18 @@ def get_mapping(session, model, column_name):
     records = session.query(model).all()
     return {getattr(record, column_name): record.ID for record in records}
 
-# Function to transform augmented data into a fact table
-def transform_to_fact_table(augmented_csv_path, fact_csv_path, session):
+# Function to fetch the mappings of every categorical column
+def get_dimension_mappings(session):
     """
-    Transform augmented data into a format suitable for a fact table.
+    Fetch the value-to-ID mappings of every categorical column of the augmented data.
 
     Parameters:
-    - augmented_csv_path (str): Path to the augmented CSV file.
-    - fact_csv_path (str): Path to save the transformed fact table CSV.
     - session (sqlalchemy.orm.Session): SQLAlchemy session for database operations.
 
     Returns:
-    - None
+    - dict: Column name -> {value: ID} mapping.
     """
-    logger.info("Loading augmented CSV")
-    df = pd.read_csv(augmented_csv_path)
-
-    logger.info("Fetching mappings for categorical variables")
-    mappings = {
+    return {
         "Car_make": get_mapping(session, CarMake, "car_make"),
         "Model": get_mapping(session, Model, "model"),
         "Fuel_type": get_mapping(session, FuelType, "fuel_type"),
@@ -227,56 +455,127 @@ def transform_to_fact_table(augmented_csv_path, fact_csv_path, session):
         "Damage": get_mapping(session, Damage, "damage"),
     }
 
+# Function to map augmented data to fact table rows
+def map_to_fact_table(df, mappings, first_id=1, seen_keys=None, source_keys=None):
+    """
+    Replace the categorical values of augmented data with their IDs and keep the fact table columns.
+
+    Parameters:
+    - df (pd.DataFrame): Augmented data.
+    - mappings (dict): Mappings returned by get_dimension_mappings.
+    - first_id (int): ID of the first row.
+    - seen_keys (set): Source keys already loaded by this run. If given, repeated listings get no key,
+      see blank_repeated_keys.
+    - source_keys (pd.Series): Precomputed source keys of the rows, used instead of computing them.
+
+    Returns:
+    - pd.DataFrame: The fact table rows, with columns in FACT_COLUMNS order.
+    """
+    fact_df = pd.DataFrame({"ID": range(first_id, first_id + len(df))}, index=df.index)
+    for column in ["Car_make", "Model", "Fuel_type", "Color", "Body_style", "Transmission", "Options", "Damage"]:
+        fact_df[f"{column}_id"] = df[column].map(mappings[column])
+    for column in ["Year", "Mileage", "Horsepower", "Website_post_date", "Sell_date", "Num_of_prev_owners", "Estimated_price"]:
+        fact_df[column] = df[column]
+    if source_keys is None:
+        source_keys = get_source_keys(df)
+        if seen_keys is not None:
+            source_keys = blank_repeated_keys(source_keys, seen_keys)
+    fact_df["Source_key"] = source_keys
+    return fact_df
+
+def get_source_keys(df):
+    """
+    Compute a stable key for every listing from its SOURCE_KEY_COLUMNS.
+
+    Parameters:
+    - df (pd.DataFrame): Base or augmented data.
+
+    Returns:
+    - pd.Series: 16-character hexadecimal keys.
+    """
+    hashes = pd.util.hash_pandas_object(df[SOURCE_KEY_COLUMNS].astype(str), index=False).to_numpy()
+    return pd.Series(np.char.mod("%016x", hashes), index=df.index)
+
+def blank_repeated_keys(source_keys, seen_keys):
+    """
+    Clear the key of listings repeated in a source export, so that full loads do not fail on the
+    unique source key. The first occurrence keeps its key, and the others are loaded with an empty
+    key, as backfill_source_keys does for rows loaded before the column existed. The post date is
+    part of the key, so equal keys always collide in the unique index.
+
+    Parameters:
+    - source_keys (pd.Series): Keys returned by get_source_keys.
+    - seen_keys (set): Keys already loaded by the run. The new keys are added to it.
+
+    Returns:
+    - pd.Series: The keys, with None for repeated listings.
+    """
+    repeated = source_keys.duplicated() | source_keys.isin(seen_keys)
+    seen_keys.update(source_keys[~repeated])
+    return source_keys.mask(repeated, None)
+
+# Function to transform augmented data into a fact table
+def transform_to_fact_table(augmented_csv_path, fact_csv_path, session):
+    """
+    Transform augmented data into a format suitable for a fact table.
+    Both files can be CSV or Parquet, depending on their extension.
+
+    Parameters:
+    - augmented_csv_path (str): Path to the augmented data file.
+    - fact_csv_path (str): Path to save the transformed fact table.
+    - session (sqlalchemy.orm.Session): SQLAlchemy session for database operations.
+
+    Returns:
+    - None
+    """
+    logger.info(f"Loading augmented data from {augmented_csv_path}")
+    df = read_frame(augmented_csv_path)
+
+    logger.info("Fetching mappings for categorical variables")
+    mappings = get_dimension_mappings(session)
+
     logger.info("Transforming categorical values to IDs")
-    df["Car_make_id"] = df["Car_make"].map(mappings["Car_make"])
-    df["Model_id"] = df["Model"].map(mappings["Model"])
-    df["Fuel_type_id"] = df["Fuel_type"].map(mappings["Fuel_type"])
-    df["Color_id"] = df["Color"].map(mappings["Color"])
-    df["Body_style_id"] = df["Body_style"].map(mappings["Body_style"])
-    df["Transmission_id"] = df["Transmission"].map(mappings["Transmission"])
-    df["Options_id"] = df["Options"].map(mappings["Options"])
-    df["Damage_id"] = df["Damage"].map(mappings["Damage"])
-
-    fact_df = df[
-        ["Car_make_id", "Model_id", "Fuel_type_id", "Color_id", "Body_style_id",
-         "Transmission_id", "Options_id", "Damage_id", "Year", "Mileage",
-         "Horsepower", "Website_post_date", "Sell_date", "Num_of_prev_owners", "Estimated_price"]
-    ]
-
-    fact_df.insert(0, "ID", range(1, len(fact_df) + 1))
+    fact_df = map_to_fact_table(df, mappings, seen_keys=set())
 
     logger.info(f"Saving fact table to {fact_csv_path}")
-    fact_df.to_csv(fact_csv_path, index=False)
+    write_frame(fact_df, fact_csv_path)
 
     logger.info("Fact table transformation complete")
 
 # Full ETL Process
-def etl_process():
+def etl_process(seed=None, base_path=BASE_CSV_PATH, file_format="csv"):
     """
     Execute the full ETL process:
-    1. Augment data from the base CSV file.
+    1. Augment data from the base file.
     2. Populate dimension tables in the database.
     3. Transform the augmented data into a fact table.
     4. Load the fact table into the database.
 
+    Parameters:
+    - seed (int): Seed of the data augmentation, for reproducible runs.
+    - base_path (str): Path to the base CSV or Parquet file.
+    - file_format (str): Format of the intermediate augmented and fact files, "csv" or "parquet".
+
     Returns:
     - None
     """
+    augmented_path = with_format(AUGMENTED_CSV_PATH, file_format)
+    fact_path = with_format(FACT_CSV_PATH, file_format)
     session = SessionLocal()
     try:
         logger.info("Starting data augmentation")
-        augment_data(BASE_CSV_PATH, AUGMENTED_CSV_PATH)
+        augment_data(base_path, augmented_path, seed=seed)
 
-        logger.info("Populating predefined dimension tables")
-        populate_predefined_dimension_tables(session)
+        logger.info("Populating dimension tables")
+        dimension_df = read_frame(augmented_path, columns=DIMENSION_COLUMNS)
+        populate_dimension_tables_bulk(session, dimension_df)
 
         logger.info("Transforming augmented data into a fact table")
-        transform_to_fact_table(AUGMENTED_CSV_PATH, FACT_CSV_PATH, session)
+        transform_to_fact_table(augmented_path, fact_path, session)
 
         logger.info("Loading fact table into the database")
-        fact_df = pd.read_csv(FACT_CSV_PATH)
-        fact_df['Sell_date'] = fact_df['Sell_date'].where(fact_df['Sell_date'].notna(), None)
-        load_to_database(fact_df, TABLE_NAME, engine)
+        fact_df = read_frame(fact_path)
+        copy_to_database(fact_df, TABLE_NAME)
 
         logger.info("ETL process completed successfully")
     except Exception:
@@ -285,5 +584,424 @@ def etl_process():
     finally:
         session.close()
 
+# Streaming ETL Process
+def etl_streaming_process(chunk_size=STREAM_CHUNK_SIZE, write_intermediate=False, seed=None,
+                          base_path=BASE_CSV_PATH, file_format="csv"):
+    """
+    Execute the ETL process chunk by chunk, with memory bounded by the chunk size:
+    every chunk of the base CSV file is augmented, mapped to IDs and copied into
+    the database before the next one is read. No intermediate files are written
+    unless requested. The whole load is committed as a single transaction.
+
+    Parameters:
+    - chunk_size (int): Number of base rows processed per chunk.
+    - write_intermediate (bool): Also write the augmented and fact files, for debugging.
+    - seed (int): Seed of the data augmentation, for reproducible runs.
+    - base_path (str): Path to the base CSV or Parquet file.
+    - file_format (str): Format of the intermediate files, "csv" or "parquet".
+
+    Returns:
+    - None
+    """
+    session = SessionLocal()
+    conn = get_connection()
+    augmented_writer = FrameWriter(with_format(AUGMENTED_CSV_PATH, file_format))
+    fact_writer = FrameWriter(with_format(FACT_CSV_PATH, file_format))
+    try:
+        logger.info("Populating dimension tables")
+        populate_dimension_tables_bulk(session)
+        mappings = get_dimension_mappings(session)
+
+        logger.info(f"Streaming {base_path} in chunks of {chunk_size} rows")
+        rng = np.random.default_rng(seed)
+        next_id = 1
+        seen_keys = set()
+        for chunk in iter_frames(base_path, chunk_size):
+            augmented_df = augment_frame(chunk, rng=rng)
+            if populate_dimension_tables_bulk(session, augmented_df):
+                mappings = get_dimension_mappings(session)
+            fact_df = map_to_fact_table(augmented_df, mappings, first_id=next_id, seen_keys=seen_keys)
+            next_id += len(fact_df)
+
+            copy_to_database(fact_df, TABLE_NAME, conn=conn)
+
+            if write_intermediate:
+                augmented_writer.write(augmented_df)
+                fact_writer.write(fact_df)
+
+        conn.commit()
+        logger.info(f"Streaming ETL process completed successfully ({next_id - 1} rows)")
+    except Exception:
+        conn.rollback()
+        logger.error("Streaming ETL process failed")
+        logger.error(traceback.format_exc())
+    finally:
+        augmented_writer.close()
+        fact_writer.close()
+        conn.close()
+        session.close()
+
+def get_watermark(conn):
+    """
+    Return the latest post or sell date already loaded into the Cars table, and its highest ID.
+
+    Parameters:
+    - conn (psycopg2.extensions.connection): Open connection.
+
+    Returns:
+    - datetime.date: The watermark, or None if the table is empty.
+    - int: The highest ID, or 0 if the table is empty.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(f'SELECT GREATEST(MAX("Website_post_date"), MAX("Sell_date")), MAX("ID") FROM "{TABLE_NAME}"')
+        watermark, max_id = cursor.fetchone()
+    return watermark, max_id or 0
+
+def upsert_to_database(df, table_name, conn):
+    """
+    Insert new listings and update the sell date of known ones, matched on their source key.
+
+    The rows are copied into a temporary staging table and merged into the target: the sell date
+    of known listings is updated, then the new ones are inserted with INSERT ... ON CONFLICT DO NOTHING,
+    so unchanged listings are left untouched. Unlike RETURNING xmax, this also works on a partitioned table.
+
+    Parameters:
+    - df (pd.DataFrame): Fact table rows, with columns in FACT_COLUMNS order.
+    - table_name (str): The name of the database table to load data into.
+    - conn (psycopg2.extensions.connection): Open connection. The caller commits.
+
+    Returns:
+    - tuple: Number of inserted rows and number of updated rows.
+    """
+    columns = ", ".join(f'"{column}"' for column in FACT_COLUMNS)
+    with conn.cursor() as cursor:
+        cursor.execute(f'CREATE TEMP TABLE IF NOT EXISTS cars_staging (LIKE "{table_name}" INCLUDING DEFAULTS) ON COMMIT DROP')
+        cursor.execute("TRUNCATE cars_staging")
+        copy_to_database(df, "cars_staging", conn=conn, quiet=True)
+        cursor.execute(f"""
+            UPDATE "{table_name}" AS target
+            SET "Sell_date" = staging."Sell_date"
+            FROM cars_staging AS staging
+            WHERE target."Source_key" = staging."Source_key"
+              AND target."Website_post_date" = staging."Website_post_date"
+              AND target."Sell_date" IS DISTINCT FROM staging."Sell_date"
+        """)
+        updated = cursor.rowcount
+        cursor.execute(f"""
+            INSERT INTO "{table_name}" ({columns})
+            SELECT {columns} FROM cars_staging
+            ON CONFLICT ("Source_key", "Website_post_date") DO NOTHING
+        """)
+        inserted = cursor.rowcount
+    return inserted, updated
+
+def backfill_source_keys(conn, table_name=TABLE_NAME):
+    """
+    Compute the Source_key of rows loaded before the column existed, from their dimension names and
+    source columns, so that incremental runs match them instead of inserting them again.
+
+    The rows are read back into the types of read_frame, so the keys are the ones get_source_keys
+    computes from the source data. A row whose key is already taken by another row with the same
+    post date is a duplicate listing and keeps an empty key.
+
+    Parameters:
+    - conn (psycopg2.extensions.connection): Open connection. The caller commits.
+    - table_name (str): The fact table.
+
+    Returns:
+    - int: The number of rows given a key.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT cars."ID", car_make.car_make, model.model, cars."Mileage", transmission.transmission,
+                   cars."Year", cars."Website_post_date", options.option, cars."Horsepower"
+            FROM "{table_name}" AS cars
+            JOIN "Car_make" AS car_make ON car_make."ID" = cars."Car_make_ID"
+            JOIN "Model" AS model ON model."ID" = cars."Model_ID"
+            JOIN "Transmission" AS transmission ON transmission."ID" = cars."Transmission_ID"
+            JOIN "Options" AS options ON options."ID" = cars."Options_ID"
+            WHERE cars."Source_key" IS NULL
+            ORDER BY cars."ID"
+        """)
+        rows = cursor.fetchall()
+    if not rows:
+        return 0
+
+    df = to_typed_frame(pd.DataFrame(rows, columns=["ID", *SOURCE_KEY_COLUMNS]))
+    keys = pd.DataFrame({"ID": df["ID"], "Source_key": get_source_keys(df), "Website_post_date": df["Website_post_date"]})
+    keys = keys.drop_duplicates(subset=["Source_key", "Website_post_date"])
+
+    with conn.cursor() as cursor:
+        cursor.execute('CREATE TEMP TABLE source_keys ("ID" INTEGER, "Source_key" VARCHAR(32)) ON COMMIT DROP')
+        buffer = io.StringIO()
+        keys[["ID", "Source_key"]].to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        cursor.copy_expert("COPY source_keys FROM STDIN WITH (FORMAT csv)", buffer)
+        cursor.execute(f"""
+            UPDATE "{table_name}" AS cars
+            SET "Source_key" = source_keys."Source_key"
+            FROM source_keys
+            WHERE cars."ID" = source_keys."ID"
+              AND NOT EXISTS (
+                  SELECT 1 FROM "{table_name}" AS keyed
+                  WHERE keyed."Source_key" = source_keys."Source_key"
+                    AND keyed."Website_post_date" = cars."Website_post_date"
+              )
+        """)
+        updated = cursor.rowcount
+        cursor.execute("DROP TABLE source_keys")
+    return updated
+
+# Incremental ETL Process
+def etl_incremental_process(chunk_size=STREAM_CHUNK_SIZE, seed=None, base_path=BASE_CSV_PATH):
+    """
+    Load only the listings posted or sold since the last run.
+
+    The watermark is the latest post or sell date already in the Cars table. Source rows
+    posted or sold on or after it are augmented, mapped to IDs and upserted on their
+    source key: new listings are inserted and listings sold since the last run get their
+    sell date updated. The run time is proportional to the delta, not to the full history.
+
+    Parameters:
+    - chunk_size (int): Number of base rows processed per chunk.
+    - seed (int): Seed of the data augmentation, for reproducible runs.
+    - base_path (str): Path to the base CSV or Parquet file.
+
+    Returns:
+    - None
+    """
+    session = SessionLocal()
+    conn = get_connection()
+    try:
+        logger.info("Populating dimension tables")
+        populate_dimension_tables_bulk(session)
+        mappings = get_dimension_mappings(session)
+
+        backfilled = backfill_source_keys(conn)
+        if backfilled:
+            logger.info(f"Computed the source key of {backfilled} rows loaded before it existed")
+
+        watermark, max_id = get_watermark(conn)
+        logger.info(f"Loading listings posted or sold since {watermark or 'the beginning'}")
+
+        rng = np.random.default_rng(seed)
+        next_id = max_id + 1
+        inserted = updated = 0
+        for chunk in iter_frames(base_path, chunk_size):
+            if watermark is not None:
+                watermark_ts = pd.Timestamp(watermark)
+                posted = chunk["Website_post_date"] >= watermark_ts
+                sold = chunk["Sell_date"] >= watermark_ts
+                chunk = chunk[posted | sold]
+            if chunk.empty:
+                continue
+
+            augmented_df = augment_frame(chunk, rng=rng)
+            if populate_dimension_tables_bulk(session, augmented_df):
+                mappings = get_dimension_mappings(session)
+            fact_df = map_to_fact_table(augmented_df, mappings, first_id=next_id)
+            next_id += len(fact_df)
+
+            chunk_inserted, chunk_updated = upsert_to_database(fact_df, TABLE_NAME, conn)
+            inserted += chunk_inserted
+            updated += chunk_updated
+
+        conn.commit()
+        logger.info(f"Incremental ETL process completed successfully ({inserted} inserted, {updated} updated)")
+    except Exception:
+        conn.rollback()
+        logger.error("Incremental ETL process failed")
+        logger.error(traceback.format_exc())
+    finally:
+        conn.close()
+        session.close()
+
+def get_max_id(conn, table_name=TABLE_NAME):
+    """
+    Return the highest ID of a table, or 0 if it is empty.
+
+    Parameters:
+    - conn (psycopg2.extensions.connection): Open connection.
+    - table_name (str): Table to read.
+
+    Returns:
+    - int: The highest ID.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(f'SELECT MAX("ID") FROM "{table_name}"')
+        max_id = cursor.fetchone()[0]
+    conn.commit()
+    return max_id or 0
+
+def delete_id_range(conn, first_id, last_id, table_name=TABLE_NAME):
+    """
+    Delete the rows of a table whose ID lies in the given range and commit.
+
+    Parameters:
+    - conn (psycopg2.extensions.connection): Open connection.
+    - first_id (int): First ID of the range.
+    - last_id (int): Last ID of the range, included.
+    - table_name (str): Table to delete from.
+
+    Returns:
+    - int: The number of rows deleted.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(f'DELETE FROM "{table_name}" WHERE "ID" BETWEEN %s AND %s', (first_id, last_id))
+        rows = cursor.rowcount
+    conn.commit()
+    return rows
+
+def process_partition(chunk, mappings, first_id, seed_sequence, table_name=TABLE_NAME, load=True, source_keys=None):
+    """
+    Augment, map and load one partition of the base data. Runs in a worker process.
+
+    Parameters:
+    - chunk (pd.DataFrame): Base rows of the partition.
+    - mappings (dict): Mappings returned by get_dimension_mappings.
+    - first_id (int): ID of the first row of the partition.
+    - seed_sequence (np.random.SeedSequence): Seed of the partition's generator.
+    - table_name (str): Table to copy the rows into.
+    - load (bool): Copy the rows into the database on the worker's own connection.
+    - source_keys (pd.Series): Source keys of the rows, computed by the main process.
+
+    Returns:
+    - int: The number of rows processed.
+    """
+    augmented_df = augment_frame(chunk, rng=np.random.default_rng(seed_sequence))
+    fact_df = map_to_fact_table(augmented_df, mappings, first_id=first_id, source_keys=source_keys)
+    if load:
+        copy_to_database(fact_df, table_name, quiet=True)
+    return len(fact_df)
+
+def run_parallel_pipeline(base_csv_path, mappings, workers, chunk_size=STREAM_CHUNK_SIZE, seed=None,
+                          table_name=TABLE_NAME, load=True):
+    """
+    Partition the base file and process the partitions on a pool of worker processes.
+
+    The main process reads the file in chunks and hands them to the workers, keeping at most
+    two partitions per worker in flight so memory stays bounded. It also computes the source
+    keys, so that listings repeated across partitions are found (see blank_repeated_keys).
+    Every worker augments its partition with its own generator (spawned from the seed), maps
+    it to IDs and copies it into the table over its own connection, so the inserts, foreign
+    key checks and index updates of the partitions run concurrently.
+
+    The run reserves the IDs following the highest ID of the table, and every partition is
+    committed on its own. If any partition fails, the rows of the reserved range are deleted
+    once the other workers are done, so a failed run loads nothing and can simply be rerun.
+
+    Parameters:
+    - base_csv_path (str): Path to the base CSV or Parquet file.
+    - mappings (dict): Mappings returned by get_dimension_mappings.
+    - workers (int): Number of worker processes.
+    - chunk_size (int): Number of base rows per partition.
+    - seed (int): Seed of the data augmentation, for reproducible runs.
+    - table_name (str): Table to load the rows into.
+    - load (bool): Load the rows into the database. Disable to time augmentation and mapping only.
+
+    Returns:
+    - int: The number of rows processed.
+    """
+    conn = get_connection() if load else None
+    first_id = get_max_id(conn, table_name) + 1 if load else 1
+    root_seed = np.random.SeedSequence(seed)
+    rows = 0
+    next_id = first_id
+    seen_keys = set()
+    pending = set()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for i, chunk in enumerate(iter_frames(base_csv_path, chunk_size)):
+                seed_sequence = np.random.SeedSequence(root_seed.entropy, spawn_key=(i,))
+                source_keys = blank_repeated_keys(get_source_keys(chunk), seen_keys)
+                pending.add(executor.submit(process_partition, chunk, mappings, next_id, seed_sequence,
+                                            table_name, load, source_keys))
+                next_id += len(chunk)
+
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    rows += sum(future.result() for future in done)
+
+            rows += sum(future.result() for future in pending)
+    except Exception:
+        # Leaving the executor waited for the partitions still running, so the range is complete
+        if load:
+            deleted = delete_id_range(conn, first_id, next_id - 1, table_name)
+            logger.warning(f"Deleted the {deleted} rows loaded by the failed run (IDs {first_id} to {next_id - 1})")
+        raise
+    finally:
+        if load:
+            conn.close()
+    return rows
+
+# Parallel ETL Process
+def etl_parallel_process(workers=None, chunk_size=STREAM_CHUNK_SIZE, seed=None, base_path=BASE_CSV_PATH):
+    """
+    Execute the ETL process on several cores: the base CSV is partitioned, and the
+    partitions are augmented, mapped to IDs and copied into the database concurrently
+    by a pool of worker processes, each over its own connection. If a partition fails,
+    the rows of the other partitions are deleted again.
+
+    Parameters:
+    - workers (int): Number of worker processes. Defaults to the number of CPUs.
+    - chunk_size (int): Number of base rows per partition.
+    - seed (int): Seed of the data augmentation, for reproducible runs.
+    - base_path (str): Path to the base CSV or Parquet file.
+
+    Returns:
+    - None
+    """
+    workers = workers or os.cpu_count() or 1
+    session = SessionLocal()
+    try:
+        logger.info("Populating dimension tables")
+        base_dimensions = read_frame(base_path, columns=["Car_make", "Model", "Transmission", "Options"])
+        populate_dimension_tables_bulk(session, base_dimensions)
+        mappings = get_dimension_mappings(session)
+
+        logger.info(f"Processing {base_path} on {workers} workers in partitions of {chunk_size} rows")
+        start = time.perf_counter()
+        rows = run_parallel_pipeline(base_path, mappings, workers, chunk_size=chunk_size, seed=seed)
+        elapsed = time.perf_counter() - start
+
+        logger.info(f"Parallel ETL process completed successfully ({rows} rows in {elapsed:.2f}s, {rows / elapsed if elapsed else 0:.0f} rows/s)")
+    except Exception:
+        logger.error("Parallel ETL process failed")
+        logger.error(traceback.format_exc())
+    finally:
+        session.close()
+
 if __name__ == "__main__":
-    etl_process()
+    parser = argparse.ArgumentParser(description="Run the car sales ETL process.")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Process the base CSV in fixed-size chunks with bounded memory.")
+    parser.add_argument("--parallel", action="store_true",
+                        help="Process partitions of the base CSV on a pool of worker processes.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes in parallel mode (defaults to the number of CPUs).")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only load listings posted or sold since the last run, upserting on their source key.")
+    parser.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_SIZE,
+                        help="Rows per chunk in streaming, incremental and parallel modes.")
+    parser.add_argument("--write-intermediate", action="store_true",
+                        help="Also write the augmented and fact files in streaming mode.")
+    parser.add_argument("--base-path", default=BASE_CSV_PATH,
+                        help="Base data file, CSV or Parquet depending on its extension.")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="Format of the intermediate augmented and fact files.")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Seed of the data augmentation, for reproducible runs.")
+    parser.add_argument("--drop-indexes", action="store_true",
+                        help="Drop the foreign keys and non-unique indexes of Cars during the load and rebuild them afterwards.")
+    args = parser.parse_args()
+
+    with secondary_indexes_dropped() if args.drop_indexes else nullcontext():
+        if args.parallel:
+            etl_parallel_process(workers=args.workers, chunk_size=args.chunk_size, seed=args.seed, base_path=args.base_path)
+        elif args.incremental:
+            etl_incremental_process(chunk_size=args.chunk_size, seed=args.seed, base_path=args.base_path)
+        elif args.streaming:
+            etl_streaming_process(chunk_size=args.chunk_size, write_intermediate=args.write_intermediate, seed=args.seed,
+                                  base_path=args.base_path, file_format=args.format)
+        else:
+            etl_process(seed=args.seed, base_path=args.base_path, file_format=args.format)
@@ -0,0 +1,77 @@
+import os
+import sys
+import psycopg2
+import pytest
+from dotenv import load_dotenv
+
+# The ETL modules import each other by name and read .env and the CSV folder relative to the ETL directory
+ETL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ETL_DIR)
+os.chdir(ETL_DIR)
+
+load_dotenv(".env")
+
+def database_available():
+    """
+    Check that the database configured with the DB_* variables, as for etl.py, is reachable.
+    """
+    try:
+        psycopg2.connect(dbname=os.environ["DB_NAME"], user=os.environ["DB_USER"], password=os.environ["DB_PASSWORD"],
+                         host=os.getenv("DB_HOST", "postgresql_db"), port=int(os.getenv("DB_PORT", "5432")),
+                         connect_timeout=3).close()
+        return True
+    except (KeyError, psycopg2.OperationalError):
+        return False
+
+DATABASE_AVAILABLE = database_available()
+
+# Importing the ETL modules sets up the schema, so without a database the tests cannot even be collected
+collect_ignore_glob = [] if DATABASE_AVAILABLE else ["test_*.py"]
+
+def pytest_report_header(config):
+    return None if DATABASE_AVAILABLE else "No PostgreSQL database configured: the ETL tests are skipped"
+
+@pytest.fixture
+def conn():
+    from etl import get_connection
+
+    conn = get_connection()
+    yield conn
+    conn.rollback()
+    conn.close()
+
+@pytest.fixture
+def scratch_table(conn):
+    """
+    Return a function creating an empty copy of the Cars table under the given name, dropped after the test.
+    The copy gets the defaults of Cars, and also its constraints and indexes with including="ALL".
+    """
+    from etl import TABLE_NAME
+
+    table_names = []
+
+    def create(table_name, including="DEFAULTS"):
+        with conn.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+            cursor.execute(f'CREATE TABLE "{table_name}" (LIKE "{TABLE_NAME}" INCLUDING {including})')
+        conn.commit()
+        table_names.append(table_name)
+        return table_name
+
+    yield create
+    conn.rollback()
+    with conn.cursor() as cursor:
+        for table_name in table_names:
+            cursor.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+    conn.commit()
+
+@pytest.fixture
+def mappings():
+    from Database.database import SessionLocal
+    from etl import get_dimension_mappings
+
+    session = SessionLocal()
+    try:
+        return get_dimension_mappings(session)
+    finally:
+        session.close()
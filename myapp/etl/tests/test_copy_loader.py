@@ -0,0 +1,55 @@
+"""
+Checks the COPY loader against the legacy execute_batch loader on the database configured with the
+DB_* variables, as for etl.py. The rows go to scratch copies of the Cars table that are dropped afterwards.
+Skipped when no database is reachable.
+
+Usage (from myapp/etl):
+    python -m pytest tests
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Database.storage import read_frame
+from Database.data_simulation import augment_frame
+from etl import BASE_CSV_PATH, copy_to_database, load_to_database, map_to_fact_table
+
+COPY_TABLE_NAME = "Cars_copy_test"
+LEGACY_TABLE_NAME = "Cars_legacy_test"
+
+@pytest.fixture
+def tables(scratch_table):
+    scratch_table(COPY_TABLE_NAME)
+    scratch_table(LEGACY_TABLE_NAME)
+
+@pytest.fixture
+def fact_df(mappings):
+    base_df = read_frame(BASE_CSV_PATH).head(50)
+    return map_to_fact_table(augment_frame(base_df, rng=np.random.default_rng(0)), mappings)
+
+def fetch_rows(conn, table_name):
+    with conn.cursor() as cursor:
+        cursor.execute(f'SELECT * FROM "{table_name}" ORDER BY "ID"')
+        return cursor.fetchall()
+
+def test_copy_matches_legacy_loader(conn, tables, fact_df):
+    assert copy_to_database(fact_df, COPY_TABLE_NAME, chunk_size=20) == len(fact_df)
+    load_to_database(fact_df, LEGACY_TABLE_NAME, None)
+
+    copied = fetch_rows(conn, COPY_TABLE_NAME)
+    inserted = fetch_rows(conn, LEGACY_TABLE_NAME)
+    assert len(copied) == len(inserted) == len(fact_df)
+    assert [tuple(map(type, row)) for row in copied] == [tuple(map(type, row)) for row in inserted]
+    assert copied == inserted
+
+def test_copy_loads_missing_sell_date_as_null(conn, tables, fact_df):
+    fact_df["Sell_date"] = fact_df["Sell_date"].astype("datetime64[us]")
+    fact_df.loc[fact_df.index[0], "Sell_date"] = pd.NaT
+    copy_to_database(fact_df, COPY_TABLE_NAME, quiet=True)
+
+    with conn.cursor() as cursor:
+        cursor.execute(f'SELECT "Sell_date" FROM "{COPY_TABLE_NAME}" ORDER BY "ID"')
+        sell_dates = [sell_date for (sell_date,) in cursor.fetchall()]
+    assert sell_dates[0] is None
+    assert None not in sell_dates[1:]
@@ -0,0 +1,73 @@
+"""
+Checks that the parallel pipeline loads all of its partitions or none of them on the database
+configured with the DB_* variables, as for etl.py. The rows go to a scratch copy of the Cars table
+that is dropped afterwards. Skipped when no database is reachable.
+
+Usage (from myapp/etl):
+    python -m pytest tests
+"""
+
+import pandas as pd
+import psycopg2
+import pytest
+
+from Database.storage import read_frame
+from etl import BASE_CSV_PATH, run_parallel_pipeline
+
+PARALLEL_TABLE_NAME = "Cars_parallel_test"
+ROWS = 300
+
+@pytest.fixture
+def table(scratch_table):
+    return scratch_table(PARALLEL_TABLE_NAME, including="ALL")
+
+@pytest.fixture
+def base_csv_path(tmp_path):
+    path = str(tmp_path / "base.csv")
+    read_frame(BASE_CSV_PATH).head(ROWS).to_csv(path, index=False)
+    return path
+
+def count_rows(conn, table_name):
+    with conn.cursor() as cursor:
+        cursor.execute(f'SELECT count(*), count(DISTINCT "Source_key") FROM "{table_name}"')
+        return cursor.fetchone()
+
+def test_parallel_pipeline_loads_every_partition(conn, table, mappings, base_csv_path):
+    rows = run_parallel_pipeline(base_csv_path, mappings, workers=2, chunk_size=50, seed=0,
+                                 table_name=table)
+
+    assert rows == ROWS
+    assert count_rows(conn, table) == (ROWS, ROWS)
+
+def test_failed_partition_loads_nothing(conn, table, mappings, base_csv_path):
+    # One make gets an ID that is not an integer, so only the partitions holding it fail to COPY
+    make = read_frame(base_csv_path)["Car_make"].iloc[-1]
+    mappings["Car_make"] = {**mappings["Car_make"], make: "invalid"}
+
+    with pytest.raises(psycopg2.DataError):
+        run_parallel_pipeline(base_csv_path, mappings, workers=2, chunk_size=50, seed=0,
+                              table_name=table)
+
+    assert count_rows(conn, table) == (0, 0)
+
+def test_failed_run_keeps_the_rows_already_loaded(conn, table, mappings, base_csv_path):
+    run_parallel_pipeline(base_csv_path, mappings, workers=2, chunk_size=50, seed=0,
+                          table_name=table)
+
+    # Loading the same listings again violates the unique source key in every partition
+    with pytest.raises(psycopg2.IntegrityError):
+        run_parallel_pipeline(base_csv_path, mappings, workers=2, chunk_size=50, seed=0,
+                              table_name=table)
+
+    assert count_rows(conn, table) == (ROWS, ROWS)
+
+def test_repeated_listings_are_loaded_without_a_key(conn, table, mappings, tmp_path):
+    # The last listing repeats the first one, in another partition
+    base_df = read_frame(BASE_CSV_PATH).head(ROWS)
+    path = str(tmp_path / "repeated.csv")
+    pd.concat([base_df, base_df.head(1)]).to_csv(path, index=False)
+
+    rows = run_parallel_pipeline(path, mappings, workers=2, chunk_size=50, seed=0, table_name=table)
+
+    assert rows == ROWS + 1
+    assert count_rows(conn, table) == (ROWS + 1, ROWS)
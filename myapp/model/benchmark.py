@@ -0,0 +1,132 @@
+"""
+Training Benchmarks
+This script measures the memory and time taken to train and evaluate the models.
+
+Benchmarks:
+- sparse: Builds a training set of the given size by repeating the training data, then one-hot
+  encodes it, fits and runs the ElasticNet and CatBoost models on it, once with dense features and
+  once with sparse CSR features (train.py --sparse). Every mode runs in a fresh process, so the
+  reported peak memory only covers that mode.
+
+Usage:
+    python benchmark.py sparse --data car_sales_augmented.csv --rows 1000000 --iterations 100
+"""
+
+import argparse
+import multiprocessing
+import resource
+import time
+import pandas as pd
+import scipy.sparse as sp
+from catboost import CatBoostRegressor
+from sklearn.linear_model import ElasticNet
+from train import DATA_PATH, load_data, preprocess, to_csr
+
+def peak_memory_mb():
+    """
+    Return the peak resident memory of the current process in MB.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def make_synthetic_data(path, rows):
+    """
+    Build a training set with the given number of rows by repeating the training data.
+    The mileage of every repetition is shifted so that each row is a distinct listing.
+
+    Parameters:
+    - path (str): Path to the training data.
+    - rows (int): Number of rows to build.
+
+    Returns:
+    - pd.DataFrame: The training data.
+    """
+    base_data = load_data(path)
+    repeats = -(-rows // len(base_data))
+    data = pd.concat([base_data.assign(Mileage=base_data["Mileage"] + i) for i in range(repeats)], ignore_index=True)
+    return data.iloc[:rows].copy()
+
+def run_mode(path, rows, sparse, iterations):
+    """
+    Preprocess the training data, then fit and evaluate both models with dense or sparse features.
+
+    Returns:
+    - dict: Seconds spent in every stage.
+    - float: Size of the price feature matrix in MB.
+    - float: Peak resident memory of the process in MB.
+    """
+    data = make_synthetic_data(path, rows)
+    timings = {}
+
+    start = time.perf_counter()
+    data_dummified, price_features_dummified = preprocess(data, sparse)
+    X_price = data_dummified[price_features_dummified]
+    if sparse:
+        X_price = to_csr(X_price)
+        matrix_mb = (X_price.data.nbytes + X_price.indices.nbytes + X_price.indptr.nbytes) / 2**20
+    else:
+        # The frame is converted to this float64 matrix by the estimators
+        matrix_mb = X_price.shape[0] * X_price.shape[1] * 8 / 2**20
+    y_price = data_dummified['Log_Estimated_price']
+    timings["preprocess"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    price_model = ElasticNet(random_state=42, alpha=0.1, l1_ratio=0.5).fit(X_price, y_price)
+    timings["elasticNetFit"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    price_predictions = price_model.predict(X_price)
+    timings["elasticNetPredict"] = time.perf_counter() - start
+
+    sold = (data_dummified['Days_to_sell'] >= 0).to_numpy()
+    if sparse:
+        X_sell_time = sp.hstack([X_price, sp.csr_matrix(price_predictions[:, None])], format="csr")[sold]
+    else:
+        X_sell_time = X_price.assign(Predicted_Log_Price=price_predictions)[sold]
+    y_sell_time = data_dummified['Days_to_sell'][sold]
+
+    start = time.perf_counter()
+    sell_time_model = CatBoostRegressor(random_state=42, verbose=0, iterations=iterations).fit(X_sell_time, y_sell_time)
+    timings["catBoostFit"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sell_time_model.predict(X_sell_time)
+    timings["catBoostPredict"] = time.perf_counter() - start
+
+    return timings, matrix_mb, peak_memory_mb()
+
+def benchmark_sparse(path, rows, iterations):
+    """
+    Compare the dense and sparse training paths, each in a fresh process.
+
+    Parameters:
+    - path (str): Path to the training data.
+    - rows (int): Number of training rows.
+    - iterations (int): Number of CatBoost iterations.
+
+    Returns:
+    - dict: Mode -> (timings, matrix size in MB, peak memory in MB).
+    """
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for mode in ("dense", "sparse"):
+        with context.Pool(1) as pool:
+            results[mode] = pool.apply(run_mode, (path, rows, mode == "sparse", iterations))
+
+    stages = list(results["dense"][0])
+    print(f"{'':>8}" + "".join(f"{stage:>18}" for stage in stages) + f"{'matrix':>12}{'peak':>12}")
+    for mode, (timings, matrix_mb, peak_mb) in results.items():
+        print(f"{mode:>8}" + "".join(f"{timings[stage]:>17.2f}s" for stage in stages) + f"{matrix_mb:>10.1f}MB{peak_mb:>10.0f}MB")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark model training.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    sparse_parser = subparsers.add_parser("sparse", help="Memory and time of dense and sparse features.")
+    sparse_parser.add_argument("--data", default=DATA_PATH, help="Training data, CSV or Parquet.")
+    sparse_parser.add_argument("--rows", type=int, default=1_000_000, help="Number of training rows.")
+    sparse_parser.add_argument("--iterations", type=int, default=100, help="Number of CatBoost iterations.")
+
+    args = parser.parse_args()
+    if args.benchmark == "sparse":
+        benchmark_sparse(args.data, args.rows, args.iterations)
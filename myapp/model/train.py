@@ -10,48 +10,506 @@ Workflow:
 3. Model training and evaluation:
    - ElasticNet for price prediction.
    - CatBoost for days-to-sell prediction.
-4. Model saving: Save trained models for future use.
+4. Model saving: Save trained models as a versioned model bundle for the API.
+
+With --sell-time-features native, the days-to-sell model skips the one-hot encoding: it takes the dimension IDs
+of the Cars star schema as CatBoost categorical features, so the API passes the request IDs straight through.
+The IDs are read from the Cars table, or looked up by name in the dimension tables when training from a file.
+
+With --tune, both models are tuned by cross-validated grid search on the training split before the final fit:
+ElasticNet with GridSearchCV, CatBoost with catboost.cv and early stopping. The trials run in parallel on --jobs
+processes.
+
+The preprocessed data of a training file is cached on disk, keyed on a hash of the file contents and of the
+preprocessing config, so later runs on the same data skip parsing and encoding (--no-cache disables it).
+
+With --sparse, the dummies are kept as sparse columns and both models are fitted on CSR matrices holding only
+the non-zero features, which cuts the memory needed for the feature matrices.
+
+The training data can be a CSV file or a typed Parquet file (as written by the ETL with --format parquet,
+or by this script with --save-parquet). Parquet files are memory-mapped and only the needed columns are read.
+It can also be read from the Cars star schema populated by the ETL, in batches through a server-side cursor.
+
+Usage:
+    python train.py --data car_sales_augmented.csv
+    python train.py --data car_sales_augmented.parquet
+    python train.py --source database
+    python train.py --source database --sell-time-features native
+    python train.py --data car_sales_augmented.csv --tune --jobs 8
 
 Modules and Libraries:
 - pandas, numpy: For data manipulation and transformations.
+- pyarrow: For reading and writing Parquet files.
+- scipy: For the sparse feature matrices of --sparse.
 - scikit-learn: For model training, evaluation, and splitting data.
 - catboost: For training the regression model for days-to-sell prediction.
-- pickle: For saving trained models to disk.
+- joblib: For running the tuning trials in parallel.
+- pickle: For saving trained models in the legacy format.
 - dotenv: For loading environment variables.
 - sqlalchemy: For database connection and data retrieval.
 """
 
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from itertools import product
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
+import pyarrow.parquet as pq
+import scipy.sparse as sp
+from joblib import Parallel, delayed
+from sklearn.model_selection import GridSearchCV, KFold, train_test_split
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 from sklearn.linear_model import ElasticNet
-from catboost import CatBoostRegressor
+from catboost import CatBoostRegressor, Pool, cv
 from dotenv import load_dotenv
 import sqlalchemy.orm as orm
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 import pickle
 
-data = pd.read_csv("car_sales_augmented.csv")
-
-# Convert dates and create time-related features
-data['Website_post_date'] = pd.to_datetime(data['Website_post_date'], format='%d.%m.%y', errors='coerce')
-data['Sell_date'] = pd.to_datetime(data['Sell_date'], format='%d.%m.%y', errors='coerce')
-data['Days_to_sell'] = (data['Sell_date'] - data['Website_post_date']).dt.days
-data['Days_to_sell'] = data['Days_to_sell'].fillna(-1)
+DATA_PATH = "car_sales_augmented.csv"
+MODEL_DIR = "./models/"
+DATE_FORMAT = "%d.%m.%y"  # Format of the dates in CSV files
+DB_BATCH_SIZE = 50_000  # Rows fetched per round trip from the server-side cursor
+BUNDLE_FORMAT = 1  # Version of the model bundle layout read by the API
+NATIVE_BUNDLE_FORMAT = 2  # Bundle layout of days-to-sell models taking dimension IDs, unknown to older APIs
+CACHE_DIR = "./cache/"  # Directory of the preprocessed training files
+PREPROCESS_CACHE_FORMAT = 1  # Version of the cached preprocessed data, bump when preprocess changes
+STREAM_CHUNK_SIZE = 100_000  # Rows per chunk read by --stream
+SELL_TIME_SAMPLE_ROWS = 1_000_000  # Rows sampled for the sell time model by --stream
 
-# Log transformation for Estimated_price
-data['Log_Estimated_price'] = np.log1p(data['Estimated_price'])
+# Hyperparameter grids searched by --tune
+price_param_grid = {'alpha': [0.001, 0.01, 0.1, 1.0], 'l1_ratio': [0.1, 0.5, 0.9]}
+sell_time_param_grid = {'depth': [4, 6, 8], 'learning_rate': [0.03, 0.1]}
+CV_FOLDS = 5
+MAX_ITERATIONS = 2000  # Upper bound on the CatBoost iterations, reached only without early stopping
+EARLY_STOPPING_ROUNDS = 50  # Iterations without improvement of the validation loss before a CatBoost trial stops
 
-# One-hot encode categorical columns
+# Columns read from the training data, in the order the features are built
 categorical_cols = ['Car_make', 'Model', 'Transmission', 'Options', 'Color', 'Damage', 'Body_style', 'Fuel_type']
-data_dummified = pd.get_dummies(data, columns=categorical_cols, drop_first=True)
+numerical_cols = ['Mileage', 'Year', 'Horsepower', 'Num_of_prev_owners']
+date_cols = ['Website_post_date', 'Sell_date']
+training_cols = [
+    'Car_make', 'Model', 'Mileage', 'Transmission', 'Year', 'Website_post_date', 'Sell_date', 'Options',
+    'Horsepower', 'Color', 'Damage', 'Body_style', 'Fuel_type', 'Num_of_prev_owners', 'Estimated_price',
+]
+
+# Dimension table, name column and Cars foreign key of every categorical column
+dimension_tables = {
+    'Car_make': ('Car_make', 'car_make', 'Car_make_ID'),
+    'Model': ('Model', 'model', 'Model_ID'),
+    'Transmission': ('Transmission', 'transmission', 'Transmission_ID'),
+    'Options': ('Options', 'option', 'Options_ID'),
+    'Color': ('Color', 'color', 'Color_ID'),
+    'Damage': ('Damage', 'damage', 'Damage_ID'),
+    'Body_style': ('Body_style', 'body_style', 'Body_style_ID'),
+    'Fuel_type': ('Fuel_type', 'fuel_type', 'Fuel_type_ID'),
+}
+
+# Dimension ID columns, the categorical features of the native days-to-sell model
+id_cols = [foreign_key for _, _, foreign_key in dimension_tables.values()]
+
+# Values read as missing, so they get no dummy column (matches read_csv, which parses "None" as missing)
+missing_categories = {'Damage': ['None']}
+
+# Compact integer widths used in Parquet files
+integer_types = {'Mileage': 'int32', 'Year': 'int16', 'Horsepower': 'int16', 'Num_of_prev_owners': 'int8', 'Estimated_price': 'int32'}
+
+def is_parquet(path):
+    """Returns True if the path points to a Parquet file."""
+    return os.path.splitext(path)[1] == ".parquet"
+
+def load_data(path, date_format=DATE_FORMAT):
+    """
+    Load the training columns from a CSV or Parquet file.
+
+    CSV files are parsed and their dates converted with date_format. Parquet files already hold
+    categorical, date and integer columns, and are read through a memory map with only the
+    training columns projected.
+
+    Parameters:
+    - path (str): Path to the training data.
+    - date_format (str): Format of the dates in CSV files.
+
+    Returns:
+    - pd.DataFrame: The training data, with real date columns.
+    """
+    if is_parquet(path):
+        data = pd.read_parquet(path, columns=training_cols, memory_map=True)
+        for col, values in missing_categories.items():
+            data[col] = data[col].cat.remove_categories([value for value in values if value in data[col].cat.categories])
+        return data
+
+    data = pd.read_csv(path, usecols=training_cols)[training_cols]
+    for col in date_cols:
+        data[col] = pd.to_datetime(data[col], format=date_format, errors='coerce')
+    return data
+
+def load_dimension_categories(connection):
+    """
+    Build a fixed category set per categorical column from the dimension values used in the Cars table,
+    so the dummy columns match those of the same data read from a file.
+
+    Parameters:
+    - connection (sqlalchemy.engine.Connection): Open connection.
+
+    Returns:
+    - dict: Column -> (sorted category names, array mapping each ID to its category code, -1 if missing).
+    """
+    categories = {}
+    for col, (table, name_column, foreign_key) in dimension_tables.items():
+        rows = connection.execute(text(
+            f'SELECT "ID", "{name_column}" FROM "{table}" WHERE "ID" IN (SELECT DISTINCT "{foreign_key}" FROM "Cars")'
+        )).all()
+        names = sorted({name for _, name in rows} - set(missing_categories.get(col, [])))
+        codes = {name: code for code, name in enumerate(names)}
+        lookup = np.full(max((id_value for id_value, _ in rows), default=0) + 1, -1, dtype=np.int16)
+        for id_value, name in rows:
+            lookup[id_value] = codes.get(name, -1)
+        categories[col] = (names, lookup)
+    return categories
+
+def iter_database_batches(database_url, batch_size=DB_BATCH_SIZE, keep_ids=False):
+    """
+    Read the training columns of the Cars fact table in batches.
+
+    Only the foreign keys and the columns the models need are selected, ordered by ID, and fetched
+    batch_size rows at a time through a server-side cursor. The IDs are decoded with the dimension
+    tables into categoricals with fixed category sets, so every batch can be one-hot encoded on its
+    own into the same columns.
+
+    Parameters:
+    - database_url (str): SQLAlchemy URL of the database populated by the ETL.
+    - batch_size (int): Number of rows fetched per batch.
+    - keep_ids (bool): Also keep the foreign keys, as the columns listed in id_cols.
+
+    Yields:
+    - pd.DataFrame: A batch with the same columns as the data returned by load_data.
+    """
+    fact_cols = ", ".join('"%s"' % (dimension_tables[col][2] if col in dimension_tables else col) for col in training_cols)
+    query = text(f'SELECT {fact_cols} FROM "Cars" ORDER BY "ID"')
+
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as connection:
+            categories = load_dimension_categories(connection)
+            result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+            for rows in result.partitions(batch_size):
+                batch = pd.DataFrame.from_records(rows, columns=training_cols)
+                if keep_ids:
+                    for col, (_, _, foreign_key) in dimension_tables.items():
+                        batch[foreign_key] = batch[col].astype('int32')
+                for col, (names, lookup) in categories.items():
+                    batch[col] = pd.Categorical.from_codes(lookup[batch[col].to_numpy(dtype=np.intp)], categories=names)
+                for col in date_cols:
+                    batch[col] = pd.to_datetime(batch[col])
+                yield batch
+    finally:
+        engine.dispose()
+
+def load_features_from_database(database_url, batch_size=DB_BATCH_SIZE, keep_ids=False, sparse=False):
+    """
+    Build the dummified training data from the Cars fact table.
+
+    The batches of iter_database_batches are one-hot encoded one at a time, and only the compact
+    encoded batches are kept in memory.
+
+    Parameters:
+    - database_url (str): SQLAlchemy URL of the database populated by the ETL.
+    - batch_size (int): Number of rows fetched per batch.
+    - keep_ids (bool): Also keep the foreign keys, as the columns listed in id_cols.
+    - sparse (bool): Keep the dummies as sparse columns.
+
+    Returns:
+    - pd.DataFrame: The dummified data.
+    - list: The price prediction features.
+    """
+    batches = []
+    rows_fetched = 0
+    price_features_dummified = None
+    for batch in iter_database_batches(database_url, batch_size, keep_ids):
+        batch_dummified, price_features_dummified = preprocess(batch, sparse)
+        batches.append(batch_dummified)
+        rows_fetched += len(batch)
+
+    if not batches:
+        raise ValueError("The Cars table is empty; run the ETL first.")
+    print(f"Fetched {rows_fetched} rows from the Cars table in {len(batches)} batches")
+    return pd.concat(batches, ignore_index=True), price_features_dummified
+
+def load_dimension_ids(database_url):
+    """
+    Read the ID of every name of the dimension tables.
+
+    Parameters:
+    - database_url (str): SQLAlchemy URL of the database populated by the ETL.
+
+    Returns:
+    - dict: Column -> {name: ID}.
+    """
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as connection:
+            return {
+                col: {name: id_value for id_value, name in connection.execute(text(f'SELECT "ID", "{name_column}" FROM "{table}"'))}
+                for col, (table, name_column, _) in dimension_tables.items()
+            }
+    finally:
+        engine.dispose()
+
+def add_dimension_ids(data, dimension_ids):
+    """
+    Add the dimension ID of every categorical value, as the columns listed in id_cols, by looking
+    the names up in the dimension tables. Values missing from the tables get the ID -1.
+
+    Parameters:
+    - data (pd.DataFrame): Data returned by load_data.
+    - dimension_ids (dict): IDs returned by load_dimension_ids.
+
+    Returns:
+    - pd.DataFrame: The data with the ID columns.
+    """
+    for col, (_, _, foreign_key) in dimension_tables.items():
+        names = data[col].astype(object)
+        # Values read as missing are stored by name in the dimension tables
+        if col in missing_categories:
+            names = names.where(names.notna(), missing_categories[col][0])
+        data[foreign_key] = names.map(dimension_ids[col]).fillna(-1).astype('int32')
+
+    unknown = {foreign_key: int((data[foreign_key] < 0).sum()) for foreign_key in id_cols if (data[foreign_key] < 0).any()}
+    if unknown:
+        print(f"Values without a dimension ID: {unknown}")
+    return data
+
+def scan_categories(path, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Collect the sorted values of every categorical column of a training file, reading it in chunks,
+    so every chunk can be one-hot encoded on its own into the same columns as the whole file.
+
+    Returns:
+    - dict: Column -> sorted category names, without the values read as missing.
+    """
+    values = {col: set() for col in categorical_cols}
+    if is_parquet(path):
+        chunks = (batch.to_pandas() for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=categorical_cols))
+    else:
+        chunks = pd.read_csv(path, usecols=categorical_cols, chunksize=chunk_size)
+    for chunk in chunks:
+        for col in categorical_cols:
+            values[col].update(chunk[col].dropna().unique())
+    return {col: sorted(values[col] - set(missing_categories.get(col, []))) for col in categorical_cols}
+
+def iter_file_batches(path, categories, chunk_size=STREAM_CHUNK_SIZE, date_format=DATE_FORMAT, dimension_ids=None):
+    """
+    Read the training columns of a CSV or Parquet file in chunks.
+
+    Parameters:
+    - path (str): Path to the training data.
+    - categories (dict): Category names of every categorical column, as returned by scan_categories.
+    - chunk_size (int): Number of rows per chunk.
+    - date_format (str): Format of the dates in CSV files.
+    - dimension_ids (dict): IDs returned by load_dimension_ids, to add the columns listed in id_cols.
+
+    Yields:
+    - pd.DataFrame: A chunk with the same columns as the data returned by load_data.
+    """
+    if is_parquet(path):
+        chunks = (batch.to_pandas() for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=training_cols))
+    else:
+        chunks = pd.read_csv(path, usecols=training_cols, chunksize=chunk_size)
+    for chunk in chunks:
+        chunk = chunk[training_cols]
+        for col, names in categories.items():
+            chunk[col] = chunk[col].astype(pd.CategoricalDtype(names))
+        if not is_parquet(path):
+            for col in date_cols:
+                chunk[col] = pd.to_datetime(chunk[col], format=date_format, errors='coerce')
+        if dimension_ids is not None:
+            chunk = add_dimension_ids(chunk, dimension_ids)
+        yield chunk
+
+def save_parquet(data, path):
+    """
+    Save training data as a typed Parquet file: categorical dimension columns,
+    real dates and compact integers.
+    """
+    data = data.astype({col: 'category' for col in categorical_cols})
+    data = data.astype({col: dtype for col, dtype in integer_types.items() if data[col].notna().all()})
+    data.to_parquet(path, index=False)
+    print(f"Training data saved as {path}")
+
+def fingerprint_file(path, chunk_size=1 << 20):
+    """
+    Hash the contents of a file, so a rewritten file with the same size and modification time is still told apart.
+
+    Returns:
+    - str: The hex digest.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def preprocessing_key(path, date_format=DATE_FORMAT, dimension_ids=None):
+    """
+    Key the preprocessed data of a training file on its contents and on everything preprocess depends on:
+    the cache format, the date format, the columns and the dimension IDs added for native categorical features.
+
+    Returns:
+    - str: The hex digest.
+    """
+    config = {
+        "format": PREPROCESS_CACHE_FORMAT,
+        "data": fingerprint_file(path),
+        "dateFormat": date_format,
+        "trainingColumns": training_cols,
+        "categoricalColumns": categorical_cols,
+        "missingCategories": missing_categories,
+        "dimensionIds": dimension_ids,
+    }
+    return hashlib.blake2b(json.dumps(config, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+def save_preprocessed(data_dummified, price_features_dummified, path):
+    """
+    Store preprocessed data in the cache directory path: the dummies as a boolean CSC matrix in NumPy's
+    .npz format, the other columns as Parquet and the column order in a manifest.json. The entry is
+    written under a temporary name and renamed once complete, so a crashed run never leaves half an entry.
+    """
+    dummy_columns = [col for col in data_dummified.columns
+                     if data_dummified[col].dtype == bool or isinstance(data_dummified[col].dtype, pd.SparseDtype)]
+    staging_path = f"{path}.{os.getpid()}.tmp"
+    os.makedirs(staging_path)
+
+    data_dummified.drop(columns=dummy_columns).to_parquet(os.path.join(staging_path, "columns.parquet"), index=False)
+    dummies = to_csr(data_dummified[dummy_columns]).tocsc().astype(bool)
+    sp.save_npz(os.path.join(staging_path, "dummies.npz"), dummies, compressed=False)
+    manifest = {
+        "format": PREPROCESS_CACHE_FORMAT,
+        "columns": list(data_dummified.columns),
+        "dummyColumns": dummy_columns,
+        "priceFeatures": list(price_features_dummified),
+    }
+    with open(os.path.join(staging_path, "manifest.json"), "w") as file:
+        json.dump(manifest, file)
+
+    try:
+        os.rename(staging_path, path)
+    except OSError:
+        # Another run stored the same entry first
+        shutil.rmtree(staging_path)
+
+def read_preprocessed(path, sparse=False):
+    """
+    Read preprocessed data stored by save_preprocessed, with dense or sparse dummies.
+
+    Returns:
+    - pd.DataFrame: The dummified data.
+    - list: The price prediction features.
+    """
+    with open(os.path.join(path, "manifest.json")) as file:
+        manifest = json.load(file)
+    columns = pd.read_parquet(os.path.join(path, "columns.parquet"), memory_map=True)
+    dummies = sp.load_npz(os.path.join(path, "dummies.npz"))
+    if sparse:
+        dummies = pd.DataFrame.sparse.from_spmatrix(dummies, index=columns.index, columns=manifest["dummyColumns"])
+    else:
+        dummies = pd.DataFrame(dummies.toarray(), index=columns.index, columns=manifest["dummyColumns"])
+    return pd.concat([columns, dummies], axis=1)[manifest["columns"]], manifest["priceFeatures"]
+
+def load_preprocessed(path, cache_dir, date_format=DATE_FORMAT, native_categories=False, sparse=False):
+    """
+    Preprocess a training file through a cache in cache_dir.
+
+    Entries are keyed on a hash of the file contents and of the preprocessing config (see preprocessing_key),
+    so the dates are parsed, the log price computed and the data dummified only once per dataset. An entry
+    holds the dummies as a sparse matrix and serves both dense and sparse runs.
+
+    Returns:
+    - pd.DataFrame: The dummified data.
+    - list: The price prediction features.
+    """
+    dimension_ids = load_dimension_ids(os.environ["DATABASE_URL"]) if native_categories else None
+    entry_path = os.path.join(cache_dir, preprocessing_key(path, date_format, dimension_ids))
+    if os.path.isdir(entry_path):
+        print(f"Preprocessed data loaded from the cache entry {entry_path}")
+        return read_preprocessed(entry_path, sparse)
+
+    data = load_data(path, date_format=date_format)
+    if native_categories:
+        data = add_dimension_ids(data, dimension_ids)
+    data_dummified, price_features_dummified = preprocess(data, sparse)
+    os.makedirs(cache_dir, exist_ok=True)
+    save_preprocessed(data_dummified, price_features_dummified, entry_path)
+    print(f"Preprocessed data cached as {entry_path}")
+    return data_dummified, price_features_dummified
+
+def sparse_dummies(data, columns):
+    """
+    One-hot encode columns into the same sparse columns as pd.get_dummies(drop_first=True, sparse=True),
+    building them straight from the category codes, which is several times faster.
+    """
+    frames = [data.drop(columns=columns)]
+    for col in columns:
+        categorical = pd.Categorical(data[col])
+        codes = categorical.codes
+        rows = np.flatnonzero(codes > 0)
+        dummies = sp.csc_matrix((np.ones(len(rows), dtype=bool), (rows, codes[rows] - 1)),
+                                shape=(len(data), len(categorical.categories) - 1))
+        dummy_columns = [f"{col}_{category}" for category in categorical.categories[1:]]
+        frames.append(pd.DataFrame.sparse.from_spmatrix(dummies, index=data.index, columns=dummy_columns))
+    return pd.concat(frames, axis=1)
+
+def preprocess(data, sparse=False):
+    """
+    Create the time-related features and the log price, then one-hot encode the categorical columns.
+
+    Parameters:
+    - data (pd.DataFrame): Data returned by load_data.
+    - sparse (bool): Keep the dummies as sparse columns, storing only their non-zero values.
+
+    Returns:
+    - pd.DataFrame: The dummified data.
+    - list: The price prediction features.
+    """
+    # Create time-related features
+    data['Days_to_sell'] = (data['Sell_date'] - data['Website_post_date']).dt.days
+    data['Days_to_sell'] = data['Days_to_sell'].fillna(-1)
+
+    # Log transformation for Estimated_price
+    data['Log_Estimated_price'] = np.log1p(data['Estimated_price'])
 
-# Features for price prediction
-price_features_dummified = [col for col in data_dummified.columns if col not in ['Estimated_price', 'Log_Estimated_price', 'Days_to_sell', 'Website_post_date', 'Sell_date']]
-X_price = data_dummified[price_features_dummified]
-y_price = data_dummified['Log_Estimated_price']
-X_price_train, X_price_test, y_price_train, y_price_test = train_test_split(X_price, y_price, test_size=0.2, random_state=42)
+    # One-hot encode categorical columns
+    if sparse:
+        data_dummified = sparse_dummies(data, categorical_cols)
+    else:
+        data_dummified = pd.get_dummies(data, columns=categorical_cols, drop_first=True)
+
+    # Features for price prediction
+    price_features_dummified = [col for col in data_dummified.columns if col not in ['Estimated_price', 'Log_Estimated_price', 'Days_to_sell', 'Website_post_date', 'Sell_date'] + id_cols]
+    return data_dummified, price_features_dummified
+
+def to_csr(features):
+    """
+    Convert a feature frame to a float64 CSR matrix holding only its non-zero values.
+    Sparse columns are copied from their stored values, so they are never densified.
+    """
+    rows, values, column_starts = [], [], [0]
+    for name in features.columns:
+        column = features[name].array
+        if isinstance(column, pd.arrays.SparseArray) and not column.fill_value:
+            column_rows, column_values = column.sp_index.indices, column.sp_values.astype(np.float64)
+        else:
+            column_values = np.asarray(column, dtype=np.float64)
+            column_rows = np.flatnonzero(column_values)
+            column_values = column_values[column_rows]
+        rows.append(column_rows)
+        values.append(column_values)
+        column_starts.append(column_starts[-1] + len(column_rows))
+    return sp.csc_matrix((np.concatenate(values), np.concatenate(rows), column_starts), shape=features.shape).tocsr()
 
 def train_and_evaluate_model(regressor, X_train, y_train, X_test, y_test):
     """
@@ -59,9 +517,9 @@ def train_and_evaluate_model(regressor, X_train, y_train, X_test, y_test):
 
     Parameters:
     - regressor: A regression model instance.
-    - X_train (pd.DataFrame): Training feature set.
+    - X_train (pd.DataFrame or sp.csr_matrix): Training feature set.
     - y_train (pd.Series): Training target variable.
-    - X_test (pd.DataFrame): Testing feature set.
+    - X_test (pd.DataFrame or sp.csr_matrix): Testing feature set.
     - y_test (pd.Series): Testing target variable.
 
     Returns:
@@ -76,34 +534,379 @@ def train_and_evaluate_model(regressor, X_train, y_train, X_test, y_test):
     r2 = r2_score(y_test, predictions)
     return regressor, {"MAE": mae, "MSE": mse, "R2": r2}, predictions
 
-# Price Prediction Model
-elastic_net = ElasticNet(random_state=42, alpha=0.1, l1_ratio=0.5)
-price_model, elastic_net_performance, price_predictions = train_and_evaluate_model(elastic_net, X_price_train, y_price_train, X_price_test, y_price_test)
+def tune_price_model(X_train, y_train, n_jobs=-1, folds=CV_FOLDS):
+    """
+    Grid search the ElasticNet parameters by cross-validation on the training split.
+
+    Parameters:
+    - X_train (pd.DataFrame or sp.csr_matrix): Training feature set.
+    - y_train (pd.Series): Training target variable.
+    - n_jobs (int): Number of parallel processes (-1 for one per core).
+    - folds (int): Number of cross-validation folds.
+
+    Returns:
+    - dict: The best parameters.
+    - float: Their mean validation MAE.
+    """
+    # A float matrix is shared with the workers through a memory map instead of being copied to each of them
+    search = GridSearchCV(
+        ElasticNet(random_state=42), price_param_grid, scoring='neg_mean_absolute_error',
+        cv=KFold(folds, shuffle=True, random_state=42), n_jobs=n_jobs, refit=False,
+    )
+    search.fit(X_train if sp.issparse(X_train) else X_train.to_numpy(dtype=np.float64), y_train.to_numpy())
+    return search.best_params_, -search.best_score_
+
+def cross_validate_sell_time_model(X_train, y_train, params, cat_features, folds, thread_count):
+    """
+    Cross-validate one CatBoost parameter set with early stopping.
+
+    Returns:
+    - dict: The parameters.
+    - int: The number of iterations with the lowest mean validation RMSE.
+    - float: That RMSE.
+    """
+    results = cv(
+        Pool(X_train, y_train, cat_features=cat_features),
+        {**params, 'loss_function': 'RMSE', 'iterations': MAX_ITERATIONS, 'random_seed': 42, 'thread_count': thread_count},
+        fold_count=folds, shuffle=True, partition_random_seed=42,
+        early_stopping_rounds=EARLY_STOPPING_ROUNDS, logging_level='Silent',
+    )
+    best = int(results['test-RMSE-mean'].idxmin())
+    return params, best + 1, float(results['test-RMSE-mean'][best])
+
+def tune_sell_time_model(X_train, y_train, cat_features=None, n_jobs=-1, folds=CV_FOLDS):
+    """
+    Grid search the CatBoost parameters by cross-validation on the training split, with early stopping.
 
-# Add predicted price as a feature for sell time prediction
-data_dummified['Predicted_Log_Price'] = np.nan
-data_dummified.loc[X_price_test.index, 'Predicted_Log_Price'] = price_predictions
-data_dummified['Predicted_Log_Price'] = data_dummified['Predicted_Log_Price'].fillna(data_dummified['Log_Estimated_price'])
+    Every parameter set is a separate trial, and the trials run in parallel processes. Each process
+    gets an equal share of the cores for CatBoost's own threads.
 
-sell_time_features_dummified = price_features_dummified + ['Predicted_Log_Price']
-X_sell_time = data_dummified[data_dummified['Days_to_sell'] >= 0][sell_time_features_dummified]
-y_sell_time = data_dummified[data_dummified['Days_to_sell'] >= 0]['Days_to_sell']
-X_sell_time_train, X_sell_time_test, y_sell_time_train, y_sell_time_test = train_test_split(X_sell_time, y_sell_time, test_size=0.2, random_state=42)
+    Parameters:
+    - X_train (pd.DataFrame): Training feature set.
+    - y_train (pd.Series): Training target variable.
+    - cat_features (list): Categorical feature columns, if any.
+    - n_jobs (int): Number of parallel processes (-1 for one per core).
+    - folds (int): Number of cross-validation folds.
+
+    Returns:
+    - dict: The best parameters, including the number of iterations found by early stopping.
+    - float: Their mean validation RMSE.
+    """
+    trials = [dict(zip(sell_time_param_grid, values)) for values in product(*sell_time_param_grid.values())]
+    cores = os.cpu_count() or 1
+    processes = min(len(trials), cores if n_jobs < 0 else n_jobs)
+    thread_count = max(1, cores // processes)
 
-# Days to Sell Prediction Model
-catboost_model = CatBoostRegressor(random_state=42, verbose=0)
-sell_time_model, catboost_performance, sell_time_predictions = train_and_evaluate_model(catboost_model, X_sell_time_train, y_sell_time_train, X_sell_time_test, y_sell_time_test)
+    results = Parallel(n_jobs=processes)(
+        delayed(cross_validate_sell_time_model)(X_train, y_train, params, cat_features, folds, thread_count)
+        for params in trials
+    )
+    params, iterations, rmse = min(results, key=lambda result: result[2])
+    return {**params, 'iterations': iterations}, rmse
+
+def train_models(data_dummified, price_features_dummified, native_categories=False, tune=False, n_jobs=-1, folds=CV_FOLDS, sparse=False):
+    """
+    Train the price model, then the sell time model on the features and the predicted price.
+    With native_categories, the sell time model takes the numerical features, the predicted price
+    and the dimension IDs as categorical features instead of the one-hot features.
+    With tune, the parameters of both models are first searched on their training split.
+    With sparse, both models are fitted and evaluated on CSR matrices, split like the frames.
+
+    Returns:
+    - ElasticNet: The price model.
+    - dict: Its performance metrics.
+    - CatBoostRegressor: The sell time model.
+    - dict: Its performance metrics.
+    - list: The sell time features, in model order.
+    """
+    X_price = data_dummified[price_features_dummified]
+    if sparse:
+        X_price = to_csr(X_price)
+    y_price = data_dummified['Log_Estimated_price']
+    X_price_train, X_price_test, y_price_train, y_price_test = train_test_split(X_price, y_price, test_size=0.2, random_state=42)
+
+    # Price Prediction Model
+    price_params = {'alpha': 0.1, 'l1_ratio': 0.5}
+    if tune:
+        price_params, price_cv_mae = tune_price_model(X_price_train, y_price_train, n_jobs, folds)
+        print(f"Best ElasticNet parameters: {price_params} (cross-validated MAE {price_cv_mae:.4f})")
+    elastic_net = ElasticNet(random_state=42, **price_params)
+    price_model, elastic_net_performance, price_predictions = train_and_evaluate_model(elastic_net, X_price_train, y_price_train, X_price_test, y_price_test)
+
+    # Add predicted price as a feature for sell time prediction
+    data_dummified['Predicted_Log_Price'] = np.nan
+    data_dummified.loc[y_price_test.index, 'Predicted_Log_Price'] = price_predictions
+    data_dummified['Predicted_Log_Price'] = data_dummified['Predicted_Log_Price'].fillna(data_dummified['Log_Estimated_price'])
+
+    sell_time_features = get_sell_time_features(price_features_dummified, native_categories)
+    sell_time_model, catboost_performance = train_sell_time_model(data_dummified, sell_time_features, native_categories, tune, n_jobs, folds, sparse)
+    return price_model, elastic_net_performance, sell_time_model, catboost_performance, sell_time_features
+
+class StreamingElasticNet:
+    """
+    ElasticNet fitted out of core from statistics accumulated chunk by chunk.
+
+    partial_fit only adds the Gram matrix X'X, X'y and the column sums of a chunk, so the memory
+    needed does not depend on the number of rows. The rows are shifted by the means of the first
+    chunk first, which keeps the sums small and the centered Gram matrix accurate. fit_accumulated
+    then minimizes the objective of sklearn's ElasticNet,
+        1 / (2n) * ||y - Xw - b||^2 + alpha * l1_ratio * ||w||_1 + alpha * (1 - l1_ratio) / 2 * ||w||^2,
+    by cyclic coordinate descent on the centered Gram matrix, which only has one row per feature.
+    """
 
-# Output Results
-print("\n--- Price Prediction ---")
-print("Elastic Net Performance:", elastic_net_performance)
+    def __init__(self, alpha=1.0, l1_ratio=0.5, max_iter=10_000, tol=1e-8):
+        self.alpha = alpha
+        self.l1_ratio = l1_ratio
+        self.max_iter = max_iter
+        self.tol = tol
+        self.n_samples_ = 0
 
-print("\n--- Days to Sell Prediction ---")
-print("CatBoost Performance:", catboost_performance)
+    def partial_fit(self, X, y):
+        """
+        Add a chunk of rows to the accumulated statistics.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if not len(y):
+            return self
+        if self.n_samples_ == 0:
+            self._x_shift = X.mean(axis=0)
+            self._y_shift = y.mean()
+            self._gram = np.zeros((X.shape[1], X.shape[1]))
+            self._xy = np.zeros(X.shape[1])
+            self._x_sum = np.zeros(X.shape[1])
+            self._y_sum = 0.0
 
-try:
+        X = X - self._x_shift
+        y = y - self._y_shift
+        self._gram += X.T @ X
+        self._xy += X.T @ y
+        self._x_sum += X.sum(axis=0)
+        self._y_sum += y.sum()
+        self.n_samples_ += len(y)
+        return self
+
+    def fit_accumulated(self):
+        """
+        Solve for the coefficients and the intercept from the accumulated statistics.
+        """
+        if self.n_samples_ == 0:
+            raise ValueError("No rows were accumulated.")
+        n = self.n_samples_
+        x_mean = self._x_sum / n
+        y_mean = self._y_sum / n
+        gram = self._gram / n - np.outer(x_mean, x_mean)
+        xy = self._xy / n - x_mean * y_mean
+
+        l1_penalty = self.alpha * self.l1_ratio
+        l2_penalty = self.alpha * (1.0 - self.l1_ratio)
+        coef = np.zeros(len(xy))
+        residual = xy.copy()  # xy - gram @ coef
+        for self.n_iter_ in range(1, self.max_iter + 1):
+            max_change = 0.0
+            for j in range(len(coef)):
+                if gram[j, j] == 0.0:
+                    continue
+                rho = residual[j] + gram[j, j] * coef[j]
+                new = np.sign(rho) * max(abs(rho) - l1_penalty, 0.0) / (gram[j, j] + l2_penalty)
+                if new != coef[j]:
+                    residual -= gram[:, j] * (new - coef[j])
+                    max_change = max(max_change, abs(new - coef[j]))
+                    coef[j] = new
+            if max_change <= self.tol * max(np.abs(coef).max(), 1.0):
+                break
+
+        self.coef_ = coef
+        self.intercept_ = float(self._y_shift + y_mean - (self._x_shift + x_mean) @ coef)
+        return self
+
+    def predict(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+def train_models_streaming(iter_batches, native_categories=False, sell_time_rows=SELL_TIME_SAMPLE_ROWS):
+    """
+    Train the price model out of core, then the sell time model on a random sample of the rows.
+
+    The data is read twice. The first pass one-hot encodes every batch and adds its training rows
+    to a StreamingElasticNet. The second pass evaluates the price model on the test rows and samples
+    up to sell_time_rows rows with a known days to sell, with their predicted price, for the sell time
+    model. 20% of the rows are drawn as test rows from a seeded generator, so both passes agree.
+
+    Parameters:
+    - iter_batches (callable): Function returning a new iterator over the batches of the training data.
+    - native_categories (bool): Train the sell time model on the dimension IDs as categorical features.
+    - sell_time_rows (int): Approximate number of rows sampled for the sell time model.
+
+    Returns:
+    - StreamingElasticNet: The price model.
+    - dict: Its performance metrics.
+    - CatBoostRegressor: The sell time model.
+    - dict: Its performance metrics.
+    - list: The price prediction features.
+    - list: The sell time features, in model order.
+    """
+    price_model = StreamingElasticNet(alpha=0.1, l1_ratio=0.5)
+    price_features_dummified = None
+    rows = 0
+    split = np.random.default_rng(42)
+    for batch in iter_batches():
+        batch_dummified, price_features_dummified = preprocess(batch)
+        train = split.random(len(batch_dummified)) >= 0.2
+        price_model.partial_fit(batch_dummified.loc[train, price_features_dummified].to_numpy(dtype=np.float64),
+                                batch_dummified.loc[train, 'Log_Estimated_price'].to_numpy(dtype=np.float64))
+        rows += len(batch_dummified)
+    if not rows:
+        raise ValueError("The training data is empty.")
+    price_model.fit_accumulated()
+    print(f"Price model fitted on {price_model.n_samples_} of {rows} rows in {price_model.n_iter_} iterations")
+
+    sell_time_features = get_sell_time_features(price_features_dummified, native_categories)
+    sample_fraction = min(1.0, sell_time_rows / rows)
+    split = np.random.default_rng(42)
+    sampling = np.random.default_rng(43)
+    test_rows = 0
+    absolute_error = squared_error = target_sum = target_squared_sum = 0.0
+    samples = []
+    for batch in iter_batches():
+        batch_dummified, _ = preprocess(batch)
+        test = split.random(len(batch_dummified)) < 0.2
+        target = batch_dummified['Log_Estimated_price'].to_numpy(dtype=np.float64)
+        predictions = price_model.predict(batch_dummified[price_features_dummified].to_numpy(dtype=np.float64))
+
+        errors = target[test] - predictions[test]
+        test_rows += int(test.sum())
+        absolute_error += np.abs(errors).sum()
+        squared_error += errors @ errors
+        target_sum += target[test].sum()
+        target_squared_sum += target[test] @ target[test]
+
+        # Like in train_models, only the test rows get the predicted price
+        batch_dummified['Predicted_Log_Price'] = np.where(test, predictions, target)
+        sampled = (batch_dummified['Days_to_sell'] >= 0).to_numpy() & (sampling.random(len(batch_dummified)) < sample_fraction)
+        samples.append(batch_dummified.loc[sampled, sell_time_features + ['Days_to_sell']])
+
+    total_squares = target_squared_sum - target_sum ** 2 / test_rows
+    elastic_net_performance = {
+        "MAE": float(absolute_error / test_rows),
+        "MSE": float(squared_error / test_rows),
+        "R2": float(1.0 - squared_error / total_squares),
+    }
+
+    sample = pd.concat(samples, ignore_index=True)
+    print(f"Sell time model trained on a sample of {len(sample)} rows")
+    sell_time_model, catboost_performance = train_sell_time_model(sample, sell_time_features, native_categories)
+    return price_model, elastic_net_performance, sell_time_model, catboost_performance, price_features_dummified, sell_time_features
+
+def get_sell_time_features(price_features_dummified, native_categories=False):
+    """
+    Return the sell time features, in model order: the price features and the predicted price, or with
+    native_categories the numerical features, the predicted price and the dimension IDs.
+    """
+    if native_categories:
+        return numerical_cols + ['Predicted_Log_Price'] + id_cols
+    return price_features_dummified + ['Predicted_Log_Price']
+
+def train_sell_time_model(data_dummified, sell_time_features, native_categories=False, tune=False, n_jobs=-1, folds=CV_FOLDS, sparse=False):
+    """
+    Train and evaluate the sell time model on the rows of data_dummified with a known days to sell.
+    With sparse, the one-hot features are passed to CatBoost as a CSR matrix.
+
+    Returns:
+    - CatBoostRegressor: The sell time model.
+    - dict: Its performance metrics.
+    """
+    X_sell_time = data_dummified[data_dummified['Days_to_sell'] >= 0][sell_time_features]
+    if sparse and not native_categories:
+        X_sell_time = to_csr(X_sell_time)
+    y_sell_time = data_dummified[data_dummified['Days_to_sell'] >= 0]['Days_to_sell']
+    X_sell_time_train, X_sell_time_test, y_sell_time_train, y_sell_time_test = train_test_split(X_sell_time, y_sell_time, test_size=0.2, random_state=42)
+
+    # Days to Sell Prediction Model
+    cat_features = id_cols if native_categories else None
+    sell_time_params = {}
+    if tune:
+        sell_time_params, sell_time_cv_rmse = tune_sell_time_model(X_sell_time_train, y_sell_time_train, cat_features, n_jobs, folds)
+        print(f"Best CatBoost parameters: {sell_time_params} (cross-validated RMSE {sell_time_cv_rmse:.4f})")
+    catboost_model = CatBoostRegressor(random_state=42, verbose=0, cat_features=cat_features, **sell_time_params)
+    sell_time_model, catboost_performance, sell_time_predictions = train_and_evaluate_model(catboost_model, X_sell_time_train, y_sell_time_train, X_sell_time_test, y_sell_time_test)
+    return sell_time_model, catboost_performance
+
+def save_bundle(price_model, sell_time_model, features, metrics, model_dir=MODEL_DIR, sell_time_features=None):
+    """
+    Save both models as a versioned model bundle, the format loaded by the API.
+
+    The bundle is a directory named after the UTC training time, holding the ElasticNet coefficients
+    as a NumPy array, the CatBoost model in its native .cbm format, and a manifest.json with the
+    intercept, the feature template and the metrics. It is written under a temporary name and renamed
+    once complete, then the LATEST file in model_dir is atomically pointed at it.
+
+    The manifest also records the input layout of the sell time model. A model taking dimension IDs
+    as categorical features is saved with format NATIVE_BUNDLE_FORMAT, so older APIs refuse it.
+
+    Parameters:
+    - price_model (ElasticNet): The price model.
+    - sell_time_model (CatBoostRegressor): The sell time model.
+    - features (list): The price prediction features, in model order.
+    - metrics (dict): Performance metrics of both models.
+    - model_dir (str): Directory holding the bundles.
+    - sell_time_features (list): The sell time features, in model order. Defaults to the price
+      features followed by the predicted price.
+
+    Returns:
+    - str: The path of the bundle.
+    """
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    bundle_path = os.path.join(model_dir, version)
+    staging_path = os.path.join(model_dir, f".{version}.tmp")
+    os.makedirs(staging_path)
+
+    np.save(os.path.join(staging_path, "price_coef.npy"), np.asarray(price_model.coef_, dtype=np.float64))
+    sell_time_model.save_model(os.path.join(staging_path, "sell_time_model.cbm"), format="cbm")
+
+    if sell_time_features is None:
+        sell_time_features = list(features) + ["Predicted_Log_Price"]
+    categorical_features = [sell_time_features[i] for i in sell_time_model.get_cat_feature_indices()]
+
+    manifest = {
+        "format": NATIVE_BUNDLE_FORMAT if categorical_features else BUNDLE_FORMAT,
+        "version": version,
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "features": list(features),
+        "priceModel": {
+            "type": "elastic_net",
+            "target": "log1p(Estimated_price)",
+            "coefficients": "price_coef.npy",
+            "intercept": float(price_model.intercept_),
+            "params": {"alpha": price_model.alpha, "l1_ratio": price_model.l1_ratio},
+        },
+        "sellTimeModel": {
+            "type": "catboost",
+            "file": "sell_time_model.cbm",
+            "input": "native" if categorical_features else "one_hot",
+            "params": {key: value for key, value in sell_time_model.get_params().items() if key in ("depth", "learning_rate", "iterations")},
+            "features": list(sell_time_features),
+            "categoricalFeatures": categorical_features,
+        },
+        "metrics": {name: {metric: float(value) for metric, value in values.items()} for name, values in metrics.items()},
+    }
+    with open(os.path.join(staging_path, "manifest.json"), "w") as file:
+        json.dump(manifest, file, indent=2)
+
+    os.rename(staging_path, bundle_path)
+
+    latest_path = os.path.join(model_dir, "LATEST")
+    with open(latest_path + ".tmp", "w") as file:
+        file.write(version)
+    os.replace(latest_path + ".tmp", latest_path)
+
+    print(f"Model bundle saved as {bundle_path}")
+    return bundle_path
+
+def save_models(price_model, sell_time_model, dir=MODEL_DIR):
+    """
+    Save both models with pickle into the given directory, for API versions predating model bundles.
+    """
     # Save ElasticNet model for price prediction
-    dir = "./models/"
     price_model_filename = dir + "elastic_net_price_model.pkl"
     with open(price_model_filename, "wb") as file:
         pickle.dump(price_model, file)
@@ -116,5 +919,91 @@ try:
     print(f"Price prediction model saved as {price_model_filename}")
     print(f"Days to sell prediction model saved as {sell_time_model_filename}")
 
-except NameError as e:
-    print(f"Error: {e}. Ensure the models are defined before saving.")
+def main():
+    parser = argparse.ArgumentParser(description="Train the car price and days-to-sell models.")
+    parser.add_argument("--source", choices=["file", "database"], default="file",
+                        help="Train from the --data file or from the Cars table of DATABASE_URL.")
+    parser.add_argument("--data", default=DATA_PATH,
+                        help="Training data, CSV or Parquet depending on its extension.")
+    parser.add_argument("--batch-size", type=int, default=DB_BATCH_SIZE,
+                        help="Rows fetched per batch from the database.")
+    parser.add_argument("--date-format", default=DATE_FORMAT,
+                        help="Format of the dates in CSV training data.")
+    parser.add_argument("--save-parquet", default=None,
+                        help="Also save the loaded training data as a typed Parquet file for faster later runs.")
+    parser.add_argument("--model-dir", default=MODEL_DIR,
+                        help="Directory the trained models are saved into.")
+    parser.add_argument("--pickle", action="store_true",
+                        help="Also save the models as pickles, for API versions predating model bundles.")
+    parser.add_argument("--sell-time-features", choices=["one-hot", "native"], default="one-hot",
+                        help="Feed the days-to-sell model one-hot features, or the dimension IDs as CatBoost categorical features.")
+    parser.add_argument("--tune", action="store_true",
+                        help="Search the parameters of both models by cross-validation before training them.")
+    parser.add_argument("--jobs", type=int, default=-1,
+                        help="Parallel processes running the tuning trials (-1 for one per core).")
+    parser.add_argument("--cv-folds", type=int, default=CV_FOLDS,
+                        help="Cross-validation folds of every tuning trial.")
+    parser.add_argument("--stream", action="store_true",
+                        help="Train the price model out of core, reading the data in chunks, and the days-to-sell model on a sample.")
+    parser.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_SIZE,
+                        help="Rows per chunk read from a file by --stream.")
+    parser.add_argument("--sell-time-rows", type=int, default=SELL_TIME_SAMPLE_ROWS,
+                        help="Rows sampled for the days-to-sell model by --stream.")
+    parser.add_argument("--sparse", action="store_true",
+                        help="Keep the one-hot features sparse and fit both models on CSR matrices.")
+    parser.add_argument("--cache-dir", default=CACHE_DIR,
+                        help="Directory caching the preprocessed training files, keyed on their contents.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Preprocess the training file again without reading or writing the cache.")
+    args = parser.parse_args()
+    native_categories = args.sell_time_features == "native"
+    if native_categories and args.pickle:
+        parser.error("--pickle cannot be used with --sell-time-features native: pickled models are encoded with one-hot features")
+    if args.stream and (args.tune or args.pickle or args.save_parquet or args.sparse):
+        parser.error("--stream cannot be combined with --tune, --pickle, --save-parquet or --sparse")
+
+    if args.stream:
+        if args.source == "database" or native_categories:
+            load_dotenv(".env")
+        if args.source == "database":
+            iter_batches = lambda: iter_database_batches(os.environ["DATABASE_URL"], args.batch_size, keep_ids=native_categories)
+        else:
+            categories = scan_categories(args.data, args.chunk_size)
+            dimension_ids = load_dimension_ids(os.environ["DATABASE_URL"]) if native_categories else None
+            iter_batches = lambda: iter_file_batches(args.data, categories, args.chunk_size, args.date_format, dimension_ids)
+        price_model, elastic_net_performance, sell_time_model, catboost_performance, price_features_dummified, sell_time_features = train_models_streaming(
+            iter_batches, native_categories, args.sell_time_rows)
+    elif args.source == "database":
+        load_dotenv(".env")
+        data_dummified, price_features_dummified = load_features_from_database(os.environ["DATABASE_URL"], args.batch_size, keep_ids=native_categories, sparse=args.sparse)
+    else:
+        if native_categories:
+            load_dotenv(".env")
+        if not args.no_cache and not args.save_parquet:
+            data_dummified, price_features_dummified = load_preprocessed(args.data, args.cache_dir, args.date_format, native_categories, args.sparse)
+        else:
+            data = load_data(args.data, date_format=args.date_format)
+            if args.save_parquet:
+                save_parquet(data, args.save_parquet)
+            if native_categories:
+                data = add_dimension_ids(data, load_dimension_ids(os.environ["DATABASE_URL"]))
+            data_dummified, price_features_dummified = preprocess(data, args.sparse)
+    if not args.stream:
+        price_model, elastic_net_performance, sell_time_model, catboost_performance, sell_time_features = train_models(
+            data_dummified, price_features_dummified, native_categories, args.tune, args.jobs, args.cv_folds, args.sparse)
+
+    # Output Results
+    print("\n--- Price Prediction ---")
+    print("Elastic Net Performance:", elastic_net_performance)
+
+    print("\n--- Days to Sell Prediction ---")
+    print("CatBoost Performance:", catboost_performance)
+
+    os.makedirs(args.model_dir, exist_ok=True)
+    save_bundle(price_model, sell_time_model, price_features_dummified,
+                {"price": elastic_net_performance, "sellTime": catboost_performance}, args.model_dir, sell_time_features)
+    if args.pickle:
+        save_models(price_model, sell_time_model, os.path.join(args.model_dir, ""))
+
+if __name__ == "__main__":
+    main()